@@ -1,8 +1,16 @@
 from fastapi_sqla.base import setup, setup_middlewares, startup
-from fastapi_sqla.models import Collection, Item, Page
-from fastapi_sqla.pagination import Paginate, PaginateSignature, Pagination
+from fastapi_sqla.models import Collection, CursorPage, HasNextPage, Item, Page
+from fastapi_sqla.pagination import (
+    KeysetPaginate,
+    KeysetPaginateSignature,
+    KeysetPagination,
+    Paginate,
+    PaginateSignature,
+    Pagination,
+)
 from fastapi_sqla.sqla import (
     Base,
+    ReadOnlySession,
     Session,
     SessionDependency,
     SqlaSession,
@@ -12,11 +20,17 @@ from fastapi_sqla.sqla import (
 __all__ = [
     "Base",
     "Collection",
+    "CursorPage",
+    "HasNextPage",
     "Item",
+    "KeysetPaginate",
+    "KeysetPaginateSignature",
+    "KeysetPagination",
     "Page",
     "Paginate",
     "PaginateSignature",
     "Pagination",
+    "ReadOnlySession",
     "Session",
     "SessionDependency",
     "SqlaSession",
@@ -29,11 +43,15 @@ __all__ = [
 
 try:
     from fastapi_sqla.async_pagination import (
+        AsyncKeysetPaginate,
+        AsyncKeysetPaginateSignature,
+        AsyncKeysetPagination,
         AsyncPaginate,
         AsyncPaginateSignature,
         AsyncPagination,
     )
     from fastapi_sqla.async_sqla import (
+        AsyncReadOnlySession,
         AsyncSession,
         AsyncSessionDependency,
         SqlaAsyncSession,
@@ -41,9 +59,13 @@ try:
     from fastapi_sqla.async_sqla import open_session as open_async_session
 
     __all__ += [
+        "AsyncKeysetPaginate",
+        "AsyncKeysetPaginateSignature",
+        "AsyncKeysetPagination",
         "AsyncPaginate",
         "AsyncPaginateSignature",
         "AsyncPagination",
+        "AsyncReadOnlySession",
         "AsyncSession",
         "AsyncSessionDependency",
         "SqlaAsyncSession",
@@ -0,0 +1,158 @@
+import asyncio
+import time
+from collections import Counter
+from collections.abc import Callable
+
+import structlog
+from fastapi.responses import PlainTextResponse
+
+logger = structlog.get_logger(__name__)
+
+# Admission controller of each engine key, by key
+controllers: dict[str, "AdmissionController"] = {}
+
+
+class AdmissionController:
+    """Limit the sessions of an engine key in flight, shedding requests on overload.
+
+    Requests past `max_sessions` wait for a session to end, unless `max_queued`
+    requests are already waiting, or until `max_wait_ms` elapsed: they are rejected.
+    A slot is held for the whole request, whether its session is lazy or not.
+
+    With an `autotuner`, the limit is adjusted between its bounds every interval.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int,
+        max_queued: int | None = None,
+        max_wait_ms: float | None = None,
+        retry_after: int = 1,
+        autotuner: "Autotuner | None" = None,
+    ) -> None:
+        self.max_sessions = max_sessions
+        self.limit = max_sessions
+        self.max_queued = max_queued
+        self.max_wait_ms = max_wait_ms
+        self.retry_after = retry_after
+        self.autotuner = autotuner
+        self.in_flight = 0
+        self.queued = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> bool:
+        """Wait for a session slot and return whether the request is admitted."""
+        async with self._condition:
+            if self.autotuner:
+                limit = self.autotuner.tune(self)
+                if limit > self.limit:
+                    self._condition.notify(limit - self.limit)
+                self.limit = limit
+
+            if self.in_flight < self.limit:
+                self.in_flight += 1
+                return True
+
+            if self.max_queued is not None and self.queued >= self.max_queued:
+                return False
+
+            timeout = self.max_wait_ms / 1000 if self.max_wait_ms is not None else None
+            self.queued += 1
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: self.in_flight < self.limit),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                self.queued -= 1
+
+            self.in_flight += 1
+            return True
+
+    async def release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "max_sessions": self.max_sessions,
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+        }
+
+    def rejection(self) -> PlainTextResponse:
+        return PlainTextResponse(
+            content="Service Unavailable",
+            status_code=503,
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+
+class Autotuner:
+    """Adjust the session limit of an admission controller to the pool contention.
+
+    Every `interval_s`, the limit is decreased by a quarter when the mean pool checkout
+    wait of the interval exceeds `target_wait_ms`, and increased by one when it does
+    not while sessions in flight reached the limit. It stays within `min_sessions` and
+    the `max_sessions` of the controller.
+
+    `get_checkout_wait` returns the total wait in milliseconds and the number of
+    checkouts of the key pool so far.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        get_checkout_wait: Callable[[], tuple[float, int]],
+        min_sessions: int = 1,
+        target_wait_ms: float = 10,
+        interval_s: float = 5,
+    ) -> None:
+        self.key = key
+        self.get_checkout_wait = get_checkout_wait
+        self.min_sessions = min_sessions
+        self.target_wait_ms = target_wait_ms
+        self.interval_s = interval_s
+        self.adjustments: Counter[str] = Counter()
+        self._started = time.monotonic()
+        self._checkout_wait = get_checkout_wait()
+        self._saturated = False
+
+    def tune(self, controller: AdmissionController) -> int:
+        """Return the limit of controller, adjusted when the interval elapsed."""
+        limit = controller.limit
+        self._saturated = self._saturated or controller.in_flight >= limit
+        now = time.monotonic()
+        if now - self._started < self.interval_s:
+            return limit
+
+        wait_sum, wait_count = self.get_checkout_wait()
+        previous_sum, previous_count = self._checkout_wait
+        checkouts = wait_count - previous_count
+        mean_wait_ms = (wait_sum - previous_sum) / checkouts if checkouts else 0.0
+
+        new_limit = limit
+        if mean_wait_ms > self.target_wait_ms:
+            new_limit = max(self.min_sessions, limit - max(limit // 4, 1))
+        elif self._saturated:
+            new_limit = min(controller.max_sessions, limit + 1)
+
+        if new_limit != limit:
+            direction = "increase" if new_limit > limit else "decrease"
+            self.adjustments[direction] += 1
+            logger.info(
+                "session limit adjusted",
+                engine_key=self.key,
+                limit=new_limit,
+                previous_limit=limit,
+                mean_checkout_wait_ms=round(mean_wait_ms, 1),
+            )
+
+        self._started = now
+        self._checkout_wait = (wait_sum, wait_count)
+        self._saturated = False
+        return new_limit
@@ -6,16 +6,30 @@ from fastapi import Depends, Query
 from sqlalchemy.sql import Select, func, select
 
 from fastapi_sqla.async_sqla import AsyncSessionDependency, SqlaAsyncSession
-from fastapi_sqla.models import Meta, Page
+from fastapi_sqla.models import CursorPage, HasNextPage, Meta, Page
+from fastapi_sqla.pagination import (
+    OrderBy,
+    count_preference,
+    decode_cursor,
+    get_keyset,
+    has_next_page,
+    keyset_page,
+    keyset_query,
+    window_count_page,
+    window_count_query,
+)
 from fastapi_sqla.sqla import _DEFAULT_SESSION_KEY
 
 QueryCountDependency = Callable[..., Awaitable[int]]
-AsyncPaginateSignature = Callable[[Select, bool | None], Awaitable[Page]]
+AsyncPaginateSignature = Callable[[Select, bool | None], Awaitable[Page | HasNextPage]]
 DefaultDependency = Callable[[SqlaAsyncSession, int, int], AsyncPaginateSignature]
 WithQueryCountDependency = Callable[
     [SqlaAsyncSession, int, int, int], AsyncPaginateSignature
 ]
 PaginateDependency = DefaultDependency | WithQueryCountDependency
+AsyncKeysetPaginateSignature = Callable[
+    [Select, OrderBy, bool | None], Awaitable[CursorPage]
+]
 
 
 async def default_query_count(session: SqlaAsyncSession, query: Select) -> int:
@@ -50,18 +64,67 @@ async def paginate_query(
     )
 
 
+async def paginate_with_window_count(
+    query: Select,
+    session: SqlaAsyncSession,
+    offset: int,
+    limit: int,
+    *,
+    scalars: bool = True,
+) -> Page:
+    """Paginate query counting its items in the page query, see `Pagination`."""
+    result = await session.execute(window_count_query(query, offset, limit))
+    rows = list(result.unique() if scalars else result)
+    total_items = rows[0][-1] if rows else await default_query_count(session, query)
+    return window_count_page(rows, total_items, offset, limit, scalars)
+
+
+async def paginate_without_count(
+    query: Select,
+    session: SqlaAsyncSession,
+    offset: int,
+    limit: int,
+    *,
+    scalars: bool = True,
+) -> HasNextPage:
+    """Paginate query without counting its items, see `Pagination`."""
+    result = await session.execute(query.offset(offset).limit(limit + 1))
+    data = list(result.unique().scalars() if scalars else result.mappings())
+    return has_next_page(data, offset, limit)
+
+
 def AsyncPagination(
     session_key: str = _DEFAULT_SESSION_KEY,
     min_page_size: int = 10,
     max_page_size: int = 100,
     query_count: QueryCountDependency | None = None,
+    window_count: bool = False,
+    count: bool = True,
+    negotiate_count: bool = False,
 ) -> PaginateDependency:
+    if query_count and (not count or negotiate_count):
+        raise ValueError("query_count cannot be used without counting items.")
+
+    def counting() -> bool:
+        return count
+
     def default_dependency(
         session: SqlaAsyncSession = Depends(AsyncSessionDependency(key=session_key)),
         offset: int = Query(0, ge=0),
         limit: int = Query(min_page_size, ge=1, le=max_page_size),
+        counted: bool = Depends(count_preference if negotiate_count else counting),
     ) -> AsyncPaginateSignature:
-        async def paginate(query: Select, scalars=True) -> Page:
+        async def paginate(query: Select, scalars=True) -> Page | HasNextPage:
+            if not counted:
+                return await paginate_without_count(
+                    query, session, offset, limit, scalars=scalars
+                )
+
+            if window_count:
+                return await paginate_with_window_count(
+                    query, session, offset, limit, scalars=scalars
+                )
+
             total_items = await default_query_count(session, query)
             return await paginate_query(
                 query, session, total_items, offset, limit, scalars=scalars
@@ -89,3 +152,50 @@ def AsyncPagination(
 
 
 AsyncPaginate = Annotated[AsyncPaginateSignature, Depends(AsyncPagination())]
+
+
+async def paginate_keyset(
+    query: Select,
+    order_by: OrderBy,
+    session: SqlaAsyncSession,
+    cursor: str | None,
+    limit: int,
+    *,
+    scalars: bool = True,
+) -> CursorPage:
+    keyset = get_keyset(order_by)
+    values, backwards = decode_cursor(cursor, keyset) if cursor else (None, False)
+    query = query.order_by(None).order_by(*order_by)
+    query = keyset_query(query, keyset, values, backwards, limit)
+    result = await session.execute(query)
+    rows = list(result.unique() if scalars else result)
+    return keyset_page(rows, keyset, bool(cursor), backwards, limit, scalars)
+
+
+def AsyncKeysetPagination(
+    session_key: str = _DEFAULT_SESSION_KEY,
+    min_page_size: int = 10,
+    max_page_size: int = 100,
+) -> Callable[[SqlaAsyncSession, str | None, int], AsyncKeysetPaginateSignature]:
+    """Paginate a `Select` with cursors, see `KeysetPagination`."""
+
+    def dependency(
+        session: SqlaAsyncSession = Depends(AsyncSessionDependency(key=session_key)),
+        cursor: str | None = Query(None),
+        limit: int = Query(min_page_size, ge=1, le=max_page_size),
+    ) -> AsyncKeysetPaginateSignature:
+        async def paginate(
+            query: Select, order_by: OrderBy, scalars=True
+        ) -> CursorPage:
+            return await paginate_keyset(
+                query, order_by, session, cursor, limit, scalars=scalars
+            )
+
+        return paginate
+
+    return dependency
+
+
+AsyncKeysetPaginate = Annotated[
+    AsyncKeysetPaginateSignature, Depends(AsyncKeysetPagination())
+]
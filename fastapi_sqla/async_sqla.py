@@ -1,11 +1,19 @@
+import asyncio
+import threading
+from collections import defaultdict
 from collections.abc import AsyncGenerator
-from contextlib import asynccontextmanager
+from contextlib import (
+    AbstractAsyncContextManager,
+    AsyncExitStack,
+    asynccontextmanager,
+    suppress,
+)
 from typing import Annotated
 
 import structlog
-from fastapi import Depends, Request, Response
-from fastapi.responses import PlainTextResponse
-from sqlalchemy import text
+from fastapi import Depends, Request
+from sqlalchemy import MetaData, event, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
     AsyncConnection,
     AsyncEngine,
@@ -13,45 +21,286 @@ from sqlalchemy.ext.asyncio import (
 )
 from sqlalchemy.ext.asyncio import AsyncSession as SqlaAsyncSession
 from sqlalchemy.orm.session import sessionmaker
-from starlette.types import ASGIApp, Message, Receive, Scope, Send
-
-from fastapi_sqla import aws_aurora_support, aws_rds_iam_support
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from fastapi_sqla import (
+    aws_aurora_support,
+    aws_rds_iam_support,
+    disconnect,
+    metrics,
+    read_replicas,
+    reflection,
+    statement_timeout,
+)
 from fastapi_sqla.sqla import (
     _DEFAULT_SESSION_KEY,
+    _SAFE_METHODS,
     Base,
-    _get_engine_config,
+    RoutingSession,
+    _bulkhead_engines,
+    _engine_configs,
+    _middleware_counters,
+    _prepare_lock,
+    admitting,
+    call_app,
+    get_admission_controller,
+    get_bulkhead_configs,
+    get_engine_config,
     get_envvar_prefix,
+    get_lowercase_environ,
+    get_option,
+    get_prewarm_connections,
+    get_reader_configs,
+    get_reader_selector,
+    get_reflection_concurrency,
+    get_slow_checkout_logger,
+    is_cancel_on_disconnect_enabled,
+    is_clean,
+    is_lazy_reflection_enabled,
+    is_lazy_session_enabled,
+    is_read_only,
+    is_read_only_enabled,
+    make_autocommit,
+    make_read_only,
+    requiring_lsns,
+    use_bulkhead,
+    within_deadlines,
+    wrap_send,
 )
 
 logger = structlog.get_logger(__name__)
 
 _ASYNC_REQUEST_SESSION_KEY = "fastapi_sqla_async_session"
 _async_session_factories: dict[str, sessionmaker] = {}
+_async_engines: dict[str, AsyncEngine | AsyncConnection] = {}
+_warmup_statements: defaultdict[str, list[str]] = defaultdict(list)
+
+
+def add_warmup_statement(statement: str, key: str = _DEFAULT_SESSION_KEY) -> None:
+    """Register a statement to run on every new connection of key, before it is used.
+
+    It warms the type introspection and prepared statement caches of asyncpg
+    connections. It only applies to engines created by subsequent startups of key.
+    """
+    _warmup_statements[key].append(statement)
+
+
+def setup_warmup(key: str, engine: AsyncEngine) -> None:
+    """Run the warm-up statements of key on every new connection of engine."""
+    statements = list(_warmup_statements.get(key, ()))
+    if not statements:
+        return
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def warm_up(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+        # The statements began a transaction the pool would roll back on checkin
+        dbapi_connection.commit()
+
+
+@asynccontextmanager
+async def holding_prepare_lock() -> AsyncGenerator[None, None]:
+    """Hold the lock of reflection, acquired in a thread not to block the loop.
+
+    The thread cannot be interrupted: when cancelled while waiting for the lock, the
+    thread releases it as soon as it acquires it.
+    """
+    guard = threading.Lock()
+    abandoned = acquired = False
+
+    def acquire() -> None:
+        nonlocal acquired
+        _prepare_lock.acquire()
+        with guard:
+            if abandoned:
+                _prepare_lock.release()
+            else:
+                acquired = True
+
+    try:
+        await asyncio.to_thread(acquire)
+    except asyncio.CancelledError:
+        with guard:
+            abandoned = True
+            if acquired:
+                _prepare_lock.release()
+        raise
+
+    try:
+        yield
+    finally:
+        _prepare_lock.release()
+
+
+def _with_statement_cache_sizes(key: str, config: dict) -> dict:
+    """Return async engine config with the statement cache size options of key.
+
+    `prepared_statement_cache_size` sizes the cache of prepared statements kept by
+    sqlalchemy for each connection, and `statement_cache_size` the one of asyncpg.
+    """
+    envvar_prefix = get_envvar_prefix(key)
+    config = dict(config)
+
+    prepared_statement_cache_size = get_option(key, "prepared_statement_cache_size")
+    if prepared_statement_cache_size:
+        url = make_url(config[f"{envvar_prefix}url"])
+        config[f"{envvar_prefix}url"] = url.update_query_dict(
+            {"prepared_statement_cache_size": prepared_statement_cache_size}
+        )
+
+    statement_cache_size = get_option(key, "statement_cache_size")
+    if statement_cache_size:
+        config[f"{envvar_prefix}connect_args"] = {
+            **config.get(f"{envvar_prefix}connect_args", {}),
+            "statement_cache_size": int(statement_cache_size),
+        }
+
+    return config
+
+
+def get_async_engine(key: str = _DEFAULT_SESSION_KEY) -> AsyncEngine | AsyncConnection:
+    """Return the async engine of key created by `startup`."""
+    try:
+        return _async_engines[key]
+    except KeyError as exc:
+        raise KeyError(
+            f"No async engine with key '{key}' found, "
+            "please ensure you've configured the environment variables for this key."
+        ) from exc
 
 
 def new_async_engine(
     key: str = _DEFAULT_SESSION_KEY,
 ) -> AsyncEngine | AsyncConnection:
     envvar_prefix = get_envvar_prefix(key)
-    config = _get_engine_config(envvar_prefix)
+    config = _with_statement_cache_sizes(key, get_engine_config(key))
     return async_engine_from_config(config, prefix=envvar_prefix)
 
 
+def new_async_reader_engines(key: str = _DEFAULT_SESSION_KEY) -> list[AsyncEngine]:
+    envvar_prefix = get_envvar_prefix(key)
+    return [
+        async_engine_from_config(
+            _with_statement_cache_sizes(key, config), prefix=envvar_prefix
+        )
+        for config in get_reader_configs(key)
+    ]
+
+
+def new_async_bulkhead_engines(
+    key: str = _DEFAULT_SESSION_KEY,
+) -> dict[str, AsyncEngine]:
+    envvar_prefix = get_envvar_prefix(key)
+    return {
+        name: async_engine_from_config(
+            _with_statement_cache_sizes(key, config), prefix=envvar_prefix
+        )
+        for name, config in get_bulkhead_configs(key).items()
+    }
+
+
+async def prewarm(engine: AsyncEngine, connections: int) -> None:
+    """Open connections concurrently and check them in the pool of engine."""
+    if connections <= 0:
+        return
+
+    opened = await asyncio.gather(
+        *(engine.connect().start() for _ in range(connections))
+    )
+    await asyncio.gather(*(connection.close() for connection in opened))
+
+
+async def reflect(key: str, engine: AsyncEngine) -> None:
+    """Reflect the deferred classes of Base, like `reflection.prepare`.
+
+    Batches of tables are reflected concurrently on connections of engine, as its
+    sync engine can not be used from threads.
+    """
+    cache_dir = get_option(key, "reflection_cache_dir")
+    concurrency = get_reflection_concurrency(key, engine.sync_engine)
+    tables = reflection.get_deferred_tables(Base)
+    if not tables or not reflection.SUPPORTS_SNAPSHOTS or concurrency < 2:
+        async with engine.connect() as connection:
+            await connection.run_sync(
+                lambda conn: reflection.prepare(Base, conn.engine, cache_dir=cache_dir)
+            )
+        return
+
+    path = None
+    if cache_dir:
+        async with engine.connect() as connection:
+            path = await connection.run_sync(
+                reflection.get_snapshot_path, tables, cache_dir
+            )
+
+    snapshot = reflection.load_snapshot(path) if path else None
+    if snapshot is not None:
+        logger.info("reflection snapshot loaded", path=path)
+    else:
+        snapshot = reflection.combine(
+            await asyncio.gather(
+                *(
+                    _reflect_batch(engine, batch)
+                    for batch in reflection.split(tables, concurrency)
+                )
+            )
+        )
+        if path:
+            reflection.save_snapshot(path, snapshot)
+
+    async with engine.connect() as connection:
+        await connection.run_sync(
+            lambda conn: reflection.load(Base, conn.engine, snapshot, tables)
+        )
+
+
+async def _reflect_batch(engine: AsyncEngine, tables: list) -> MetaData:
+    async with engine.connect() as connection:
+        return await connection.run_sync(reflection.reflect, tables)
+
+
 async def startup(key: str = _DEFAULT_SESSION_KEY):
-    engine_or_connection = new_async_engine(key)
-    aws_rds_iam_support.setup(engine_or_connection.sync_engine)
-    aws_aurora_support.setup(engine_or_connection.sync_engine)
+    get_lowercase_environ.cache_clear()
+    _engine_configs.pop(key, None)
+    engine_or_connection = _async_engines[key] = new_async_engine(key)
+    readers = new_async_reader_engines(key)
+    bulkheads = new_async_bulkhead_engines(key)
+    for engine in [engine_or_connection, *readers, *bulkheads.values()]:
+        aws_rds_iam_support.setup(engine.sync_engine)
+        aws_aurora_support.setup(engine.sync_engine)
 
     async_engine = (
         engine_or_connection
         if isinstance(engine_or_connection, AsyncEngine)
         else engine_or_connection.engine
     )
+    for engine in [async_engine, *readers, *bulkheads.values()]:
+        setup_warmup(key, engine)
+
+    slow_checkouts = get_slow_checkout_logger(key)
+    metrics.instrument(key, async_engine.sync_engine, slow_checkouts=slow_checkouts)
+    for i, reader in enumerate(readers):
+        metrics.instrument(
+            key, reader.sync_engine, name=f"reader_{i}", slow_checkouts=slow_checkouts
+        )
+    for name, bulkhead in bulkheads.items():
+        metrics.instrument(
+            key,
+            bulkhead.sync_engine,
+            name=f"bulkhead_{name}",
+            slow_checkouts=slow_checkouts,
+        )
 
     # Fail early
     try:
-        async with async_engine.connect() as connection:
-            await connection.execute(text("select 'ok'"))
+        for engine in [async_engine, *readers]:
+            async with engine.connect() as connection:
+                await connection.execute(text("select 'ok'"))
     except Exception:
         logger.critical(
             f"Failed querying db for key '{key}': "
@@ -59,25 +308,61 @@ async def startup(key: str = _DEFAULT_SESSION_KEY):
         )
         raise
 
-    async with async_engine.connect() as connection:
-        await connection.run_sync(lambda conn: Base.prepare(conn.engine))
+    await asyncio.gather(
+        *(
+            prewarm(engine, get_prewarm_connections(key, engine.sync_engine))
+            for engine in [async_engine, *readers]
+        )
+    )
 
-    # TODO: Use async_sessionmaker once only supporting 2.x+
-    _async_session_factories[key] = sessionmaker(
-        class_=SqlaAsyncSession, bind=engine_or_connection, expire_on_commit=False
-    )  # type: ignore
+    if is_lazy_reflection_enabled(key):
+        logger.warning("lazy reflection is not supported by async keys", engine_key=key)
+
+    async with holding_prepare_lock():
+        await reflect(key, async_engine)
 
-    logger.info("engine startup", engine_key=key, async_engine=engine_or_connection)
+    # TODO: Use async_sessionmaker once only supporting 2.x+
+    if readers:
+        sync_readers = [reader.sync_engine for reader in readers]
+        _async_session_factories[key] = sessionmaker(
+            class_=SqlaAsyncSession,
+            bind=engine_or_connection,
+            expire_on_commit=False,
+            sync_session_class=RoutingSession,
+            engine_key=key,
+            readers=sync_readers,
+            select_reader=get_reader_selector(key, sync_readers),
+        )  # type: ignore
+    else:
+        _async_session_factories[key] = sessionmaker(
+            class_=SqlaAsyncSession, bind=engine_or_connection, expire_on_commit=False
+        )  # type: ignore
+
+    _bulkhead_engines[key] = {
+        name: bulkhead.sync_engine for name, bulkhead in bulkheads.items()
+    }
+
+    logger.info(
+        "engine startup",
+        engine_key=key,
+        async_engine=engine_or_connection,
+        readers=len(readers),
+        bulkheads=sorted(bulkheads),
+    )
 
 
 @asynccontextmanager
 async def open_session(
-    key: str = _DEFAULT_SESSION_KEY,
+    key: str = _DEFAULT_SESSION_KEY, read_only: bool = False, autocommit: bool = False
 ) -> AsyncGenerator[SqlaAsyncSession, None]:
     """Context manager to open an async session and properly close it when exiting.
 
     If no exception is raised before exiting context, session is committed when exiting
     context. If an exception is raised, session is rollbacked.
+
+    When `read_only` is set, the session transactions are read only. When `autocommit`
+    is set, the session runs statements without transaction. In both cases, committing
+    is skipped unless the session has pending changes.
     """
     try:
         session: SqlaAsyncSession = _async_session_factories[key]()
@@ -88,6 +373,13 @@ async def open_session(
         ) from exc
 
     logger.bind(db_async_session=session)
+    metrics.count_session_opened(key)
+    if statement_timeout.get_deadline(key) is not None:
+        statement_timeout.set_statement_timeout(session.sync_session, key)
+    if read_only:
+        make_read_only(session.sync_session, key)
+    if autocommit:
+        make_autocommit(session.sync_session, key)
 
     try:
         yield session
@@ -97,6 +389,9 @@ async def open_session(
         raise
 
     else:
+        if is_clean(session.sync_session):
+            return
+
         try:
             await session.commit()
         except Exception:
@@ -108,11 +403,75 @@ async def open_session(
         await session.close()
 
 
+class AsyncLazySession:
+    """Proxy to a sqla async session only opened the first time it is requested.
+
+    The async `open_session` context is entered when awaiting `open`, which
+    `AsyncSessionDependency` does. Exiting the proxy context is a no-op when the
+    session was never opened.
+    """
+
+    def __init__(
+        self, key: str = _DEFAULT_SESSION_KEY, read_only: bool = False
+    ) -> None:
+        self._key = key
+        self.read_only = read_only
+        self._session: SqlaAsyncSession | None = None
+        self._exit_stack = AsyncExitStack()
+
+    @property
+    def is_opened(self) -> bool:
+        return self._session is not None
+
+    async def open(self) -> SqlaAsyncSession:
+        if self._session is None:
+            self._session = await self._exit_stack.enter_async_context(
+                open_session(self._key, read_only=self.read_only)
+            )
+        return self._session
+
+    def __getattr__(self, name: str):
+        if self._session is None:
+            raise RuntimeError(
+                f"Async session with key '{self._key}' is not opened yet, "
+                "use AsyncSessionDependency or await its `open` method first."
+            )
+        return getattr(self._session, name)
+
+    async def __aenter__(self) -> "AsyncLazySession":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> bool | None:
+        if not self.is_opened:
+            return None
+        return await self._exit_stack.__aexit__(exc_type, exc_value, traceback)
+
+
 class AsyncSessionMiddleware:
     """Middleware which injects a new sqla async session into every request.
 
     Handles creation of session, as well as commit, rollback, and closing of session.
 
+    When `lazy` is set, or `fastapi_sqla_lazy_session_enabled` environment variable is
+    `true`, the session is only opened when first requested during the request.
+
+    When the key has readers and a `consistency_header` option, the writer WAL position
+    is returned in that header after committing writes. Requests sending it back only
+    read from a reader which replayed up to it.
+
+    When the key `read_only_safe_methods` option is `true`, `GET` and `HEAD` requests
+    get a read only session, see `open_session`.
+
+    When the key has a `deadline_header` or a `statement_timeout` option, the session
+    transactions are bounded by the time left to the request, see `within_deadlines`.
+
+    When the key `cancel_on_disconnect` option is `true`, the request is cancelled when
+    the client disconnects, which cancels the running statement, see `call_app`.
+
+    When the key has a `max_sessions` option, requests past it wait for a session to
+    end or are rejected with a 503, see `AdmissionController`. Requests are admitted
+    when they enter the middleware: a lazy session holds its slot even if never opened.
+
     Usage::
 
         import fastapi_sqla
@@ -127,64 +486,118 @@ class AsyncSessionMiddleware:
             return await session.execute(...) # use your session here
     """
 
-    def __init__(self, app: ASGIApp, key: str = _DEFAULT_SESSION_KEY) -> None:
+    is_async = True
+
+    def __init__(
+        self, app: ASGIApp, key: str = _DEFAULT_SESSION_KEY, lazy: bool | None = None
+    ) -> None:
         self.app = app
         self.key = key
+        self.lazy = is_lazy_session_enabled() if lazy is None else lazy
+        self.state_key = f"{_ASYNC_REQUEST_SESSION_KEY}_{key}"
+        self.consistency_header = get_option(key, "consistency_header")
+        self.read_only = is_read_only_enabled(key)
+        self.deadline_header = get_option(key, "deadline_header")
+        self.statement_timeout = statement_timeout.parse_timeout(
+            get_option(key, "statement_timeout")
+        )
+        self.cancel_on_disconnect = is_cancel_on_disconnect_enabled(key)
+        self.admission = get_admission_controller(key)
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         if scope["type"] != "http":
             return await self.app(scope, receive, send)
 
-        async with open_session(self.key) as session:
-            request = Request(scope=scope, receive=receive, send=send)
-            setattr(request.state, f"{_ASYNC_REQUEST_SESSION_KEY}_{self.key}", session)
-
-            async def send_wrapper(message: Message) -> None:
-                if message["type"] != "http.response.start":
-                    return await send(message)
-
-                response: Response | None = None
-                status_code = message["status"]
-                is_dirty = bool(session.dirty or session.deleted or session.new)
-
-                # try to commit after response, so that we can return a proper 500
-                # and not raise a true internal server error
-                if status_code < 400:
-                    try:
-                        await session.commit()
-                    except Exception:
-                        logger.exception("commit failed, returning http error")
-                        status_code = 500
-                        response = PlainTextResponse(
-                            content="Internal Server Error", status_code=500
-                        )
-
-                if status_code >= 400:
-                    # If ever a route handler returns an http exception,
-                    # we do not want the current session to commit anything in db.
-                    if is_dirty:
-                        # optimistically only log if there were uncommitted changes
-                        logger.warning(
-                            "http error, rolling back possibly uncommitted changes",
-                            status_code=status_code,
-                        )
-                    # since this is no-op if the session is not dirty,
-                    # we can always call it
-                    await session.rollback()
-
-                if response:
-                    return await response(scope, receive, send)
-
-                return await send(message)
-
-            await self.app(scope, receive, send_wrapper)
+        request = Request(scope=scope, receive=receive, send=send)
+        read_only = self.is_read_only_request(request)
+        async with admitting([self]) as rejection:
+            if rejection:
+                return await rejection(scope, receive, send)
+
+            with (
+                suppress(disconnect.ClientDisconnectedError),
+                requiring_lsns([self], request),
+                within_deadlines([self], request),
+            ):
+                async with self.session_context(read_only) as session:
+                    setattr(request.state, self.state_key, session)
+
+                    sessions = [(self, session)]
+                    send_wrapper = wrap_send(sessions, scope, receive, send)
+                    await call_app(self.app, sessions, scope, receive, send_wrapper)
+
+    def is_read_only_request(self, request: Request) -> bool:
+        return self.read_only and request.method in _SAFE_METHODS
+
+    def session_context(self, read_only: bool = False) -> AbstractAsyncContextManager:
+        if self.lazy:
+            return AsyncLazySession(self.key, read_only=read_only)
+
+        return open_session(self.key, read_only=read_only)
+
+    def is_clean(self, session: SqlaAsyncSession | AsyncLazySession) -> bool:
+        if isinstance(session, AsyncLazySession) and not session.is_opened:
+            return True
+
+        return is_clean(session.sync_session)
+
+    async def commit(self, session: SqlaAsyncSession) -> bool:
+        """Commit session and return whether it succeeded."""
+        _middleware_counters[self.key]["commits"] += 1
+        try:
+            await session.commit()
+        except Exception:
+            logger.exception("commit failed, returning http error")
+            return False
+
+        return True
+
+    async def rollback(
+        self, session: SqlaAsyncSession, status_code: int, is_dirty: bool
+    ) -> None:
+        if is_dirty:
+            # optimistically only log if there were uncommitted changes
+            logger.warning(
+                "http error, rolling back possibly uncommitted changes",
+                status_code=status_code,
+            )
+        # since this is no-op if the session is not dirty,
+        # we can always call it
+        _middleware_counters[self.key]["rollbacks"] += 1
+        await session.rollback()
+
+    async def cancel(self, session: SqlaAsyncSession | AsyncLazySession) -> None:
+        """No-op: statements are cancelled by cancelling the request, see `call_app`."""
+
+    async def get_consistency_token(self, session: SqlaAsyncSession) -> str | None:
+        """Return the writer WAL position when session wrote through it."""
+        if isinstance(session, AsyncLazySession) and not session.is_opened:
+            return None
+
+        sync_session = session.sync_session
+        if not read_replicas.uses_writer(sync_session):
+            return None
+
+        if is_read_only(sync_session):
+            return None
+
+        return await session.run_sync(read_replicas.get_current_lsn)
 
 
 class AsyncSessionDependency:
-    def __init__(self, key: str = _DEFAULT_SESSION_KEY) -> None:
+    def __init__(
+        self,
+        key: str = _DEFAULT_SESSION_KEY,
+        read_only: bool = False,
+        autocommit: bool = False,
+        bulkhead: str | None = None,
+    ) -> None:
         self.key = key
+        self.read_only = read_only
+        self.autocommit = autocommit
+        self.bulkhead = bulkhead
 
-    def __call__(self, request: Request) -> SqlaAsyncSession:
+    async def __call__(self, request: Request) -> SqlaAsyncSession:
         """Yield the sqlalchemy async session for that request.
 
         It is meant to be used as a FastAPI dependency::
@@ -199,9 +612,14 @@ class AsyncSessionDependency:
                 session: SqlaAsyncSession = Depends(AsyncSessionDependency())
             ):
                 pass
+
+        With `read_only`, the session transactions are read only. With `autocommit`,
+        the session statements run without transaction. With `bulkhead`, the session
+        uses the connection pool of that bulkhead of the key. They only apply provided
+        the session did not begin a transaction yet.
         """
         try:
-            return getattr(request.state, f"{_ASYNC_REQUEST_SESSION_KEY}_{self.key}")
+            session = getattr(request.state, f"{_ASYNC_REQUEST_SESSION_KEY}_{self.key}")
         except AttributeError:
             logger.exception(
                 f"No async session with key '{self.key}' found in request, "
@@ -210,6 +628,23 @@ class AsyncSessionDependency:
             )
             raise
 
+        if isinstance(session, AsyncLazySession):
+            if self.read_only and not session.is_opened:
+                session.read_only = True
+            session = await session.open()
+
+        if self.bulkhead:
+            use_bulkhead(session.sync_session, self.key, self.bulkhead)
+        if self.read_only:
+            make_read_only(session.sync_session, self.key)
+        if self.autocommit:
+            make_autocommit(session.sync_session, self.key)
+
+        return session
+
 
 default_async_session_dep = AsyncSessionDependency()
 AsyncSession = Annotated[SqlaAsyncSession, Depends(default_async_session_dep)]
+AsyncReadOnlySession = Annotated[
+    SqlaAsyncSession, Depends(AsyncSessionDependency(read_only=True))
+]
@@ -1,12 +1,16 @@
+import asyncio
 import functools
-import os
 import re
+import time
+from collections.abc import Iterable
+from contextlib import AsyncExitStack, suppress
 
+import structlog
 from deprecated import deprecated
-from fastapi import FastAPI
-from sqlalchemy.engine import Connection, Engine
+from fastapi import FastAPI, Request
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from fastapi_sqla import sqla
+from fastapi_sqla import disconnect, sqla
 
 try:
     from fastapi_sqla import async_sqla
@@ -18,51 +22,114 @@ except ImportError as err:  # pragma: no cover
     asyncio_support_err = str(err)
 
 
+logger = structlog.get_logger(__name__)
+
 _ENGINE_KEYS_REGEX = re.compile(r"fastapi_sqla__(?!_)(.+)(?<!_)__(?!_).+")
 
 
 async def startup():
-    engine_keys = _get_engine_keys()
-    engines = {key: sqla.new_engine(key) for key in engine_keys}
-    for key, engine in engines.items():
-        if not _is_async_dialect(engine):
-            sqla.startup(key=key)
-        else:
-            await async_sqla.startup(key=key)
+    """Startup all engine keys concurrently, sync ones in threads."""
+    sqla.get_lowercase_environ.cache_clear()
+    await asyncio.gather(
+        *(_startup_key(key, sqla.is_async_key(key)) for key in _get_engine_keys())
+    )
+
+
+async def _startup_key(key: str, is_async: bool) -> None:
+    start = time.perf_counter()
+    if is_async:
+        await async_sqla.startup(key=key)
+    else:
+        await asyncio.to_thread(sqla.startup, key=key)
+
+    logger.info(
+        "engine key started",
+        engine_key=key,
+        duration_ms=round((time.perf_counter() - start) * 1000, 1),
+    )
+
+
+class SqlaMiddleware:
+    """Middleware which injects a session for each engine key into every request.
+
+    It manages the sessions of all keys in a single middleware: all sessions are
+    committed concurrently before the response starts, or rolled back on error. When
+    a commit fails, sessions which already committed stay committed, see `end_sessions`.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sync_keys: Iterable[str] = (),
+        async_keys: Iterable[str] = (),
+        lazy: bool | None = None,
+    ) -> None:
+        self.app = app
+        # Per key middlewares are only used for their session handling
+        self.middlewares = [
+            sqla.SessionMiddleware(app, key=key, lazy=lazy) for key in sync_keys
+        ] + [
+            async_sqla.AsyncSessionMiddleware(app, key=key, lazy=lazy)
+            for key in async_keys
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request = Request(scope=scope, receive=receive, send=send)
+        async with AsyncExitStack() as stack:
+            rejection = await stack.enter_async_context(
+                sqla.admitting(self.middlewares)
+            )
+            if rejection:
+                return await rejection(scope, receive, send)
+
+            stack.enter_context(suppress(disconnect.ClientDisconnectedError))
+            stack.enter_context(sqla.requiring_lsns(self.middlewares, request))
+            stack.enter_context(sqla.within_deadlines(self.middlewares, request))
+            sessions = []
+            for middleware in self.middlewares:
+                read_only = middleware.is_read_only_request(request)
+                session = await stack.enter_async_context(
+                    middleware.session_context(read_only)
+                )
+                setattr(request.state, middleware.state_key, session)
+                sessions.append((middleware, session))
+
+            send_wrapper = sqla.wrap_send(sessions, scope, receive, send)
+            await sqla.call_app(self.app, sessions, scope, receive, send_wrapper)
 
 
 def setup_middlewares(app: FastAPI):
-    engine_keys = _get_engine_keys()
-    engines = {key: sqla.new_engine(key) for key in engine_keys}
-    for key, engine in engines.items():
-        if not _is_async_dialect(engine):
-            app.add_middleware(sqla.SessionMiddleware, key=key)
-        else:
-            app.add_middleware(async_sqla.AsyncSessionMiddleware, key=key)
+    keys_by_dialect = _get_keys_by_dialect()
+    app.add_middleware(
+        SqlaMiddleware,
+        sync_keys=keys_by_dialect["sync_keys"],
+        async_keys=keys_by_dialect["async_keys"],
+    )
 
 
 @deprecated(
     reason="FastAPI events are deprecated. This function will be remove in the upcoming major release."  # noqa: E501
 )
 def setup(app: FastAPI):
-    engine_keys = _get_engine_keys()
-    engines = {key: sqla.new_engine(key) for key in engine_keys}
-    for key, engine in engines.items():
-        if not _is_async_dialect(engine):
-            app.add_event_handler("startup", functools.partial(sqla.startup, key=key))
-            app.add_middleware(sqla.SessionMiddleware, key=key)
-        else:
-            app.add_event_handler(
-                "startup", functools.partial(async_sqla.startup, key=key)
-            )
-            app.add_middleware(async_sqla.AsyncSessionMiddleware, key=key)
+    keys_by_dialect = _get_keys_by_dialect()
+    for key in keys_by_dialect["sync_keys"]:
+        app.add_event_handler("startup", functools.partial(sqla.startup, key=key))
+    for key in keys_by_dialect["async_keys"]:
+        app.add_event_handler("startup", functools.partial(async_sqla.startup, key=key))
+    app.add_middleware(
+        SqlaMiddleware,
+        sync_keys=keys_by_dialect["sync_keys"],
+        async_keys=keys_by_dialect["async_keys"],
+    )
 
 
 def _get_engine_keys() -> set[str]:
     keys = {sqla._DEFAULT_SESSION_KEY}
 
-    lowercase_environ = {k.lower(): v for k, v in os.environ.items()}
-    for env_var in lowercase_environ:
+    for env_var in sqla.get_lowercase_environ():
         match = _ENGINE_KEYS_REGEX.search(env_var)
         if not match:
             continue
@@ -72,5 +139,9 @@ def _get_engine_keys() -> set[str]:
     return keys
 
 
-def _is_async_dialect(engine: Engine | Connection):
-    return engine.dialect.is_async if hasattr(engine.dialect, "is_async") else False
+def _get_keys_by_dialect() -> dict[str, list[str]]:
+    engine_keys = sorted(_get_engine_keys())
+    return {
+        "sync_keys": [key for key in engine_keys if not sqla.is_async_key(key)],
+        "async_keys": [key for key in engine_keys if sqla.is_async_key(key)],
+    }
@@ -0,0 +1,124 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.orm.session import sessionmaker
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = structlog.get_logger(__name__)
+
+
+class ClientDisconnectedError(Exception):
+    """Raised when the client disconnects before the response starts.
+
+    It goes through the request session contexts, which roll back instead of
+    committing, and is then suppressed by the middlewares.
+    """
+
+
+def track_connections(session_factory: sessionmaker) -> None:
+    """Keep the connections of the current transaction in the sessions `info`.
+
+    They are the connections `cancel_statements` cancels statements of.
+    """
+    event.listen(session_factory, "after_begin", _add_connection)
+    event.listen(session_factory, "after_transaction_end", _clear_connections)
+
+
+def _add_connection(session, transaction, connection) -> None:
+    session.info.setdefault("connections", []).append(connection)
+
+
+def _clear_connections(session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("connections", None)
+
+
+def cancel_statements(session) -> None:
+    """Cancel the statements running on the connections of session.
+
+    It relies on the `cancel` method of DBAPI connections, like psycopg ones: it is a
+    no-op for drivers without it. It is safe to call from another thread than the one
+    running the statements.
+    """
+    for connection in list(session.info.get("connections", ())):
+        try:
+            fairy = connection.connection
+            dbapi_connection = getattr(fairy, "dbapi_connection", None) or fairy
+            cancel = getattr(dbapi_connection, "cancel", None)
+            if cancel is not None:
+                cancel()
+        except Exception:
+            logger.warning("failed cancelling statement", exc_info=True)
+
+
+async def call_until_disconnect(
+    app: ASGIApp,
+    scope: Scope,
+    receive: Receive,
+    send: Send,
+    on_disconnect: Callable[[], Awaitable[None]],
+    cancel_app: bool = False,
+) -> None:
+    """Call app and await `on_disconnect` if the client leaves before the response ends.
+
+    Messages are received in the background to watch for `http.disconnect`, and
+    forwarded to app in order. With `cancel_app`, app is cancelled on disconnect too.
+
+    Raise `ClientDisconnectedError` when app is cancelled, or when it starts the
+    response after the client left, so that the sessions are rolled back and not
+    committed.
+    """
+    messages: asyncio.Queue[Message] = asyncio.Queue()
+    disconnected = asyncio.Event()
+    response_complete = False
+
+    async def listen() -> None:
+        while True:
+            message = await receive()
+            messages.put_nowait(message)
+            if message["type"] != "http.disconnect":
+                continue
+
+            disconnected.set()
+            if not response_complete:
+                logger.info("client disconnected, cancelling db statements")
+                try:
+                    await on_disconnect()
+                except Exception:
+                    logger.warning("failed handling client disconnect", exc_info=True)
+                if cancel_app:
+                    app_task.cancel()
+            return
+
+    async def receive_wrapper() -> Message:
+        if disconnected.is_set() and messages.empty():
+            return {"type": "http.disconnect"}
+
+        return await messages.get()
+
+    async def send_wrapper(message: Message) -> None:
+        nonlocal response_complete
+        if message["type"] == "http.response.start" and disconnected.is_set():
+            raise ClientDisconnectedError()
+
+        if message["type"] == "http.response.body" and not message.get("more_body"):
+            response_complete = True
+
+        await send(message)
+
+    async def call_app() -> None:
+        await app(scope, receive_wrapper, send_wrapper)
+
+    app_task: asyncio.Task[None] = asyncio.create_task(call_app())
+    listener = asyncio.create_task(listen())
+    try:
+        await app_task
+    except asyncio.CancelledError:
+        if not (cancel_app and disconnected.is_set() and app_task.cancelled()):
+            raise
+
+        raise ClientDisconnectedError() from None
+    finally:
+        listener.cancel()
@@ -0,0 +1,340 @@
+import bisect
+import functools
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from weakref import WeakKeyDictionary, ref
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from fastapi_sqla import admission
+
+logger = structlog.get_logger(__name__)
+
+# Upper bounds, in milliseconds, of the buckets of duration histograms
+BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_pool_metrics: dict[str, dict[str, "PoolMetrics"]] = {}
+_sessions_opened: Counter[str] = Counter()
+_instrumented: "WeakKeyDictionary[Engine, PoolMetrics]" = WeakKeyDictionary()
+
+# Method and path of current request, for logging
+current_route: ContextVar[str | None] = ContextVar("current_route", default=None)
+
+
+class Histogram:
+    """Histogram of durations in milliseconds, with the buckets of `BUCKETS`."""
+
+    def __init__(self) -> None:
+        self.bucket_counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        # Sync sessions observe durations from the threads of their key executor
+        self._lock = threading.Lock()
+
+    def observe(self, duration_ms: float) -> None:
+        bucket = bisect.bisect_left(BUCKETS, duration_ms)
+        with self._lock:
+            self.bucket_counts[bucket] += 1
+            self.sum += duration_ms
+            self.count += 1
+
+    def stats(self) -> dict:
+        """Return cumulative bucket counts by upper bound, sum and count."""
+        with self._lock:
+            bucket_counts, total, count = list(self.bucket_counts), self.sum, self.count
+
+        cumulative, buckets = 0, {}
+        for bound, bucket_count in zip((*BUCKETS, "+Inf"), bucket_counts, strict=True):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+
+        return {"buckets": buckets, "sum": total, "count": count}
+
+
+class SlowCheckoutLogger:
+    """Log pool checkouts waiting longer than a threshold, at most once per interval.
+
+    Each log reports how many slow checkouts were not logged since the previous one.
+    """
+
+    def __init__(self, threshold_ms: float, interval_s: float = 1.0) -> None:
+        self.threshold_ms = threshold_ms
+        self.interval_s = interval_s
+        self._lock = threading.Lock()
+        self._last_logged = float("-inf")
+        self._suppressed = 0
+
+    def observe(self, key: str, metrics: "PoolMetrics", wait_ms: float) -> None:
+        if wait_ms < self.threshold_ms:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_logged < self.interval_s:
+                self._suppressed += 1
+                return
+
+            suppressed, self._suppressed = self._suppressed, 0
+            self._last_logged = now
+
+        logger.warning(
+            "slow pool checkout",
+            engine_key=key,
+            engine=metrics.name,
+            route=current_route.get(),
+            wait_ms=round(wait_ms, 1),
+            suppressed=suppressed,
+            **metrics.gauges(),
+        )
+
+
+class PoolMetrics:
+    """Metrics of the connection pool of an engine."""
+
+    def __init__(self, engine: Engine, name: str) -> None:
+        self._engine = ref(engine)
+        self.name = name
+        self.checkout_wait = Histogram()
+        self.connect_latency = Histogram()
+        self.invalidations = 0
+        self.slow_checkouts: SlowCheckoutLogger | None = None
+
+    def gauges(self) -> dict[str, int | None]:
+        engine = self._engine()
+        gauges = {}
+        for name in ("size", "checkedout", "overflow", "checkedin"):
+            method = getattr(engine.pool, name, None) if engine else None
+            gauges[name] = method() if method else None
+
+        return gauges
+
+    def stats(self) -> dict:
+        return {
+            **self.gauges(),
+            "invalidations": self.invalidations,
+            "checkout_wait_ms": self.checkout_wait.stats(),
+            "connect_latency_ms": self.connect_latency.stats(),
+        }
+
+
+def instrument(
+    key: str,
+    engine: Engine,
+    name: str = "writer",
+    slow_checkouts: SlowCheckoutLogger | None = None,
+) -> PoolMetrics:
+    """Collect the metrics of engine pool, under key and engine name.
+
+    With `slow_checkouts`, checkouts waiting longer than its threshold are logged.
+    """
+    if engine in _instrumented:
+        metrics = _pool_metrics.setdefault(key, {})[name] = _instrumented[engine]
+        metrics.slow_checkouts = slow_checkouts
+        return metrics
+
+    metrics = _instrumented[engine] = PoolMetrics(engine, name)
+    metrics.slow_checkouts = slow_checkouts
+    _pool_metrics.setdefault(key, {})[name] = metrics
+
+    @event.listens_for(engine, "do_connect")
+    def start_connect(dialect, connection_record, cargs, cparams):
+        connection_record.info["connect_start"] = time.perf_counter()
+
+    @event.listens_for(engine, "connect")
+    def end_connect(dbapi_connection, connection_record):
+        start = connection_record.info.pop("connect_start", None)
+        if start is not None:
+            metrics.connect_latency.observe((time.perf_counter() - start) * 1000)
+
+    @event.listens_for(engine, "invalidate")
+    def count_invalidation(dbapi_connection, connection_record, exception):
+        metrics.invalidations += 1
+
+    @event.listens_for(engine, "engine_disposed")
+    def time_new_pool_checkouts(engine):
+        _time_checkouts(key, engine.pool, metrics)
+
+    _time_checkouts(key, engine.pool, metrics)
+    return metrics
+
+
+def _time_checkouts(key: str, pool: Pool, metrics: PoolMetrics) -> None:
+    """Observe the time `pool.connect` waits for a connection in metrics.
+
+    Pool events fire once the connection is checked out, so the wait is timed around
+    `pool.connect`. The engine replaces its pool when disposed: `instrument` then
+    times the new one.
+    """
+    connect = pool.connect
+
+    @functools.wraps(connect)
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            wait_ms = (time.perf_counter() - start) * 1000
+            metrics.checkout_wait.observe(wait_ms)
+            if metrics.slow_checkouts:
+                metrics.slow_checkouts.observe(key, metrics, wait_ms)
+
+    pool.connect = timed_connect  # type: ignore[method-assign]
+
+
+def count_session_opened(key: str) -> None:
+    _sessions_opened[key] += 1
+
+
+def get_checkout_wait(key: str = "default") -> tuple[float, int]:
+    """Return the total checkout wait in milliseconds and checkouts of key writer."""
+    metrics = _pool_metrics.get(key, {}).get("writer")
+    if metrics is None:
+        return 0.0, 0
+
+    return metrics.checkout_wait.sum, metrics.checkout_wait.count
+
+
+def get_admission_stats(key: str = "default") -> dict | None:
+    """Return the admission controller state of key and its autotuning adjustments."""
+    controller = admission.controllers.get(key)
+    if controller is None:
+        return None
+
+    adjustments = controller.autotuner.adjustments if controller.autotuner else {}
+    return {
+        **controller.stats(),
+        "increases": adjustments.get("increase", 0),
+        "decreases": adjustments.get("decrease", 0),
+    }
+
+
+def get_pool_stats(key: str = "default") -> dict:
+    """Return the pool metrics of the engines of key, and the sessions it opened.
+
+    Pool metrics are by engine name: `writer`, and `reader_{i}` for readers. When key
+    has an admission controller, its state is returned under `admission`.
+    """
+    return {
+        "sessions_opened": _sessions_opened[key],
+        "engines": {
+            name: metrics.stats()
+            for name, metrics in _pool_metrics.get(key, {}).items()
+        },
+        "admission": get_admission_stats(key),
+    }
+
+
+def render() -> str:
+    """Return the metrics of all engine keys in Prometheus text format."""
+    gauges = {
+        "size": "Number of connections the pool keeps.",
+        "checkedout": "Number of connections checked out of the pool.",
+        "overflow": "Number of connections opened beyond the pool size.",
+        "checkedin": "Number of idle connections in the pool.",
+    }
+    histograms = {
+        "checkout_wait_ms": "Time waited to check a connection out of the pool.",
+        "connect_latency_ms": "Time spent opening a new db connection.",
+    }
+    keys = sorted({*_pool_metrics, *admission.controllers})
+    stats = {key: get_pool_stats(key) for key in keys}
+
+    lines = [
+        "# HELP fastapi_sqla_sessions_opened_total Number of sessions opened.",
+        "# TYPE fastapi_sqla_sessions_opened_total counter",
+    ]
+    for key, key_stats in stats.items():
+        lines.append(
+            f'fastapi_sqla_sessions_opened_total{{engine_key="{key}"}} '
+            f"{key_stats['sessions_opened']}"
+        )
+
+    engines = [
+        (f'engine_key="{key}",engine="{name}"', engine_stats)
+        for key, key_stats in stats.items()
+        for name, engine_stats in key_stats["engines"].items()
+    ]
+
+    for name, description in gauges.items():
+        lines += [
+            f"# HELP fastapi_sqla_pool_{name} {description}",
+            f"# TYPE fastapi_sqla_pool_{name} gauge",
+        ]
+        lines += [
+            f"fastapi_sqla_pool_{name}{{{labels}}} {engine_stats[name]}"
+            for labels, engine_stats in engines
+            if engine_stats[name] is not None
+        ]
+
+    lines += [
+        "# HELP fastapi_sqla_pool_invalidations_total Number of invalidated "
+        "connections.",
+        "# TYPE fastapi_sqla_pool_invalidations_total counter",
+    ]
+    lines += [
+        f"fastapi_sqla_pool_invalidations_total{{{labels}}} "
+        f"{engine_stats['invalidations']}"
+        for labels, engine_stats in engines
+    ]
+
+    for name, description in histograms.items():
+        metric = f"fastapi_sqla_pool_{name}"
+        lines += [f"# HELP {metric} {description}", f"# TYPE {metric} histogram"]
+        for labels, engine_stats in engines:
+            histogram = engine_stats[name]
+            lines += [
+                f'{metric}_bucket{{{labels},le="{bound}"}} {count}'
+                for bound, count in histogram["buckets"].items()
+            ]
+            lines.append(f"{metric}_sum{{{labels}}} {histogram['sum']}")
+            lines.append(f"{metric}_count{{{labels}}} {histogram['count']}")
+
+    admissions = {
+        key: key_stats["admission"]
+        for key, key_stats in stats.items()
+        if key_stats["admission"]
+    }
+    admission_gauges = {
+        "limit": "Number of sessions admitted in flight.",
+        "in_flight": "Number of admitted sessions in flight.",
+        "queued": "Number of requests waiting to be admitted.",
+    }
+    for name, description in admission_gauges.items():
+        lines += [
+            f"# HELP fastapi_sqla_admission_{name} {description}",
+            f"# TYPE fastapi_sqla_admission_{name} gauge",
+        ]
+        lines += [
+            f'fastapi_sqla_admission_{name}{{engine_key="{key}"}} {stats[name]}'
+            for key, stats in admissions.items()
+        ]
+
+    lines += [
+        "# HELP fastapi_sqla_admission_adjustments_total Number of autotuning "
+        "adjustments of the session limit.",
+        "# TYPE fastapi_sqla_admission_adjustments_total counter",
+    ]
+    for key, admission_stats in admissions.items():
+        for direction in ("increase", "decrease"):
+            lines.append(
+                "fastapi_sqla_admission_adjustments_total"
+                f'{{engine_key="{key}",direction="{direction}"}} '
+                f"{admission_stats[f'{direction}s']}"
+            )
+
+    return "\n".join(lines) + "\n"
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Starlette endpoint returning `render`, to be added to the app routes.
+
+    `app.add_route("/metrics", fastapi_sqla.metrics.metrics_endpoint)`
+    """
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
@@ -32,3 +32,34 @@ class Page(Collection[ItemT], Generic[ItemT]):
     """A page of the collection with info on current page and total items in meta."""
 
     meta: Meta
+
+
+class CursorMeta(BaseModel):
+    """Meta information on current page, with the cursors of adjacent pages"""
+
+    next_cursor: str | None = Field(
+        None, description="Cursor of the next page. None on the last page."
+    )
+    prev_cursor: str | None = Field(
+        None, description="Cursor of the previous page. None on the first page."
+    )
+
+
+class CursorPage(Collection[ItemT], Generic[ItemT]):
+    """A page of the collection with cursors of adjacent pages in meta."""
+
+    meta: CursorMeta
+
+
+class HasNextMeta(BaseModel):
+    """Meta information on current page, without counting items of the collection"""
+
+    offset: int = Field(..., description="Current page offset")
+    page_number: int = Field(..., description="Current page number. Starts at 1.")
+    has_next: bool = Field(..., description="Whether there is a next page")
+
+
+class HasNextPage(Collection[ItemT], Generic[ItemT]):
+    """A page of the collection with whether there is a next page in meta."""
+
+    meta: HasNextMeta
@@ -1,21 +1,39 @@
+import base64
+import datetime
+import decimal
+import json
 import math
-from collections.abc import Callable, Iterator
+import uuid
+from collections.abc import Callable, Iterator, Sequence
 from functools import singledispatch
-from typing import Annotated, cast
+from typing import Annotated, Any, cast
 
-from fastapi import Depends, Query
+from fastapi import Depends, Header, HTTPException, Query, Response
+from sqlalchemy import and_, literal, or_, tuple_
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Query as LegacyQuery
-from sqlalchemy.sql import Select, func, select
+from sqlalchemy.sql import ColumnElement, Select, func, operators, select
+from sqlalchemy.sql.elements import UnaryExpression
 
-from fastapi_sqla.models import Meta, Page
+from fastapi_sqla.models import (
+    CursorMeta,
+    CursorPage,
+    HasNextMeta,
+    HasNextPage,
+    Meta,
+    Page,
+)
 from fastapi_sqla.sqla import _DEFAULT_SESSION_KEY, SessionDependency, SqlaSession
 
 DbQuery = LegacyQuery | Select
 QueryCountDependency = Callable[..., int]
-PaginateSignature = Callable[[DbQuery, bool | None], Page]
+PaginateSignature = Callable[[DbQuery, bool | None], Page | HasNextPage]
 DefaultDependency = Callable[[SqlaSession, int, int], PaginateSignature]
 WithQueryCountDependency = Callable[[SqlaSession, int, int, int], PaginateSignature]
 PaginateDependency = DefaultDependency | WithQueryCountDependency
+OrderBy = Sequence[Any]
+KeysetPaginateSignature = Callable[[Select, OrderBy, bool | None], CursorPage]
+Keyset = list[tuple[ColumnElement, bool]]
 
 
 def default_query_count(session: SqlaSession, query: DbQuery) -> int:
@@ -106,18 +124,162 @@ def _paginate(
     )
 
 
+def window_count_query(query: Select, offset: int, limit: int) -> Select:
+    """Return the page query, selecting the total number of items as last column."""
+    return (
+        query.add_columns(func.count().over().label("total_items"))
+        .offset(offset)
+        .limit(limit)
+    )
+
+
+def window_count_page(
+    rows: list[Row], total_items: int, offset: int, limit: int, scalars: bool = True
+) -> Page:
+    """Return the page of rows fetched by `window_count_query`."""
+    if scalars:
+        data = [row[0] for row in rows]
+    else:
+        data = [dict(zip(row._fields[:-1], row[:-1], strict=True)) for row in rows]
+
+    return Page(
+        data=data,
+        meta=Meta(
+            offset=offset,
+            total_items=total_items,
+            total_pages=math.ceil(total_items / limit),
+            page_number=math.floor(offset / limit + 1),
+        ),
+    )
+
+
+def paginate_with_window_count(
+    query: Select,
+    session: SqlaSession,
+    offset: int,
+    limit: int,
+    *,
+    scalars: bool = True,
+) -> Page:
+    """Paginate query counting its items with `count(*) OVER ()`, in the page query.
+
+    Items are only counted by a separate query when the page is empty.
+    """
+    result = session.execute(window_count_query(query, offset, limit))
+    rows = list(result.unique() if scalars else result)
+    total_items = rows[0][-1] if rows else default_query_count(session, query)
+    return window_count_page(rows, total_items, offset, limit, scalars)
+
+
+def has_next_page(data: list, offset: int, limit: int) -> HasNextPage:
+    """Return the page of the `limit + 1` items fetched by `paginate_without_count`."""
+    return HasNextPage(
+        data=data[:limit],
+        meta=HasNextMeta(
+            offset=offset,
+            page_number=math.floor(offset / limit + 1),
+            has_next=len(data) > limit,
+        ),
+    )
+
+
+def paginate_without_count(
+    query: DbQuery,
+    session: SqlaSession,
+    offset: int,
+    limit: int,
+    *,
+    scalars: bool = True,
+) -> HasNextPage:
+    """Paginate query without counting its items.
+
+    One more row than the page size is fetched, to tell whether there is a next page.
+    """
+    query = query.offset(offset).limit(limit + 1)
+    if isinstance(query, LegacyQuery):
+        data = query.all()
+    else:
+        result = session.execute(query)
+        data = list(result.unique().scalars() if scalars else result.mappings())
+
+    return has_next_page(data, offset, limit)
+
+
+def prefers_no_count(prefer: str | None) -> bool:
+    """Return whether the `Prefer` header value contains the `count=none` preference."""
+    for preference in (prefer or "").split(","):
+        name, _, value = preference.split(";")[0].partition("=")
+        if name.strip().lower() == "count" and value.strip(' "').lower() == "none":
+            return True
+
+    return False
+
+
+def count_preference(
+    response: Response,
+    count: bool = Query(True, description="Whether to count items of the collection"),
+    prefer: str | None = Header(None),
+) -> bool:
+    """Return whether the request wants items counted.
+
+    Counting is skipped with the `count=false` query parameter, or the `count=none`
+    preference of the `Prefer` header.
+    """
+    vary = response.headers.get("Vary")
+    if not vary:
+        response.headers["Vary"] = "Prefer"
+    elif not {"*", "prefer"} & {value.strip().lower() for value in vary.split(",")}:
+        response.headers["Vary"] = f"{vary}, Prefer"
+
+    if prefers_no_count(prefer):
+        response.headers["Preference-Applied"] = "count=none"
+        return False
+
+    return count
+
+
 def Pagination(
     session_key: str = _DEFAULT_SESSION_KEY,
     min_page_size: int = 10,
     max_page_size: int = 100,
     query_count: QueryCountDependency | None = None,
+    window_count: bool = False,
+    count: bool = True,
+    negotiate_count: bool = False,
 ) -> PaginateDependency:
+    """Paginate queries with offset and limit query parameters.
+
+    Items are counted by `query_count` when set, else by `default_query_count`. With
+    `window_count`, `Select` queries are counted in the page query instead, see
+    `paginate_with_window_count`.
+
+    Without `count`, items are not counted and pages are `HasNextPage`, see
+    `paginate_without_count`. With `negotiate_count`, each request chooses, see
+    `count_preference`.
+    """
+    if query_count and (not count or negotiate_count):
+        raise ValueError("query_count cannot be used without counting items.")
+
+    def counting() -> bool:
+        return count
+
     def default_dependency(
         session: SqlaSession = Depends(SessionDependency(key=session_key)),
         offset: int = Query(0, ge=0),
         limit: int = Query(min_page_size, ge=1, le=max_page_size),
+        counted: bool = Depends(count_preference if negotiate_count else counting),
     ) -> PaginateSignature:
-        def paginate(query: DbQuery, scalars=True) -> Page:
+        def paginate(query: DbQuery, scalars=True) -> Page | HasNextPage:
+            if not counted:
+                return paginate_without_count(
+                    query, session, offset, limit, scalars=scalars
+                )
+
+            if window_count and isinstance(query, Select):
+                return paginate_with_window_count(
+                    query, session, offset, limit, scalars=scalars
+                )
+
             total_items = default_query_count(session, query)
             return paginate_query(
                 query, session, total_items, offset, limit, scalars=scalars
@@ -145,3 +307,250 @@ def Pagination(
 
 
 Paginate = Annotated[PaginateSignature, Depends(Pagination())]
+
+
+def get_keyset(order_by: OrderBy) -> Keyset:
+    """Return the ordering expressions, with whether each one is descending.
+
+    Expressions are columns or mapped attributes, ascending or descending.
+    """
+    keyset = []
+    for clause in order_by:
+        expression = clause
+        if hasattr(expression, "__clause_element__"):
+            expression = expression.__clause_element__()
+
+        descending = False
+        if isinstance(expression, UnaryExpression):
+            if expression.modifier not in (operators.asc_op, operators.desc_op):
+                raise ValueError(f"Unsupported keyset pagination ordering: {clause}")
+
+            descending = expression.modifier is operators.desc_op
+            expression = expression.element
+
+        keyset.append((expression, descending))
+
+    if not keyset:
+        raise ValueError("Keyset pagination requires ordering expressions.")
+
+    return keyset
+
+
+def encode_cursor(values: Sequence, backwards: bool) -> str:
+    """Return an opaque cursor to the rows after, or before, the keyset values."""
+    payload: dict[str, Any] = {"values": [_encode_value(value) for value in values]}
+    if backwards:
+        payload["backwards"] = True
+
+    content = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(content).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keyset: Keyset) -> tuple[list, bool]:
+    """Return the keyset values of cursor, and whether it points backwards.
+
+    An invalid cursor raises a 400 HTTP error.
+    """
+    try:
+        content = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(content)
+        values = payload["values"]
+        if len(values) != len(keyset):
+            raise ValueError("Cursor does not match query ordering.")
+
+        return [
+            _decode_value(value, expression)
+            for value, (expression, _) in zip(values, keyset, strict=True)
+        ], bool(payload.get("backwards"))
+
+    except (
+        ValueError,
+        KeyError,
+        TypeError,
+        AttributeError,
+        ArithmeticError,
+    ) as exc:
+        raise HTTPException(
+            status_code=400, detail="Invalid pagination cursor."
+        ) from exc
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime.date | datetime.time):
+        return value.isoformat()
+
+    if isinstance(value, decimal.Decimal | uuid.UUID):
+        return str(value)
+
+    return value
+
+
+def _decode_value(value: Any, expression: ColumnElement) -> Any:
+    """Return the cursor value of expression, with the python type of its column.
+
+    A value of another type raises a `TypeError`, so that it is not sent to the db.
+    """
+    try:
+        python_type = expression.type.python_type
+    except NotImplementedError:
+        return value
+
+    if value is None:
+        return value
+
+    if python_type in (datetime.datetime, datetime.date, datetime.time):
+        return python_type.fromisoformat(_check_type(value, str))
+
+    if python_type in (decimal.Decimal, uuid.UUID):
+        return python_type(_check_type(value, str))
+
+    if python_type is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+
+    return _check_type(value, python_type)
+
+
+def _check_type(value: Any, python_type: type) -> Any:
+    # bool is an int, but not a valid value of integer columns
+    if not isinstance(value, python_type) or (
+        isinstance(value, bool) and python_type is not bool
+    ):
+        raise TypeError(f"Expected a {python_type.__name__} cursor value: {value!r}")
+
+    return value
+
+
+def keyset_query(
+    query: Select, keyset: Keyset, values: list | None, backwards: bool, limit: int
+) -> Select:
+    """Return query of the `limit + 1` rows after, or before, keyset values.
+
+    Rows are selected with their keyset values as last columns. Backwards, they are
+    in reverse order.
+    """
+    if values is not None:
+        query = query.where(_keyset_filter(keyset, values, backwards))
+
+    if backwards:
+        query = query.order_by(None).order_by(
+            *(
+                expression.asc() if descending else expression.desc()
+                for expression, descending in keyset
+            )
+        )
+
+    return query.add_columns(
+        *(expression.label(f"keyset_{i}") for i, (expression, _) in enumerate(keyset))
+    ).limit(limit + 1)
+
+
+def _keyset_filter(keyset: Keyset, values: list, backwards: bool) -> ColumnElement:
+    def after(expression: ColumnElement, descending: bool, value: Any):
+        return expression < value if descending != backwards else expression > value
+
+    # Row values comparison can use a multi-column index, when directions match
+    if len({descending for _, descending in keyset}) == 1:
+        expressions = tuple_(*(expression for expression, _ in keyset))
+        literals = tuple_(
+            *(
+                literal(value, expression.type)
+                for (expression, _), value in zip(keyset, values, strict=True)
+            )
+        )
+        return after(expressions, keyset[0][1], literals)
+
+    return or_(
+        *(
+            and_(
+                *(
+                    expression == value
+                    for (expression, _), value in zip(
+                        keyset[:i], values[:i], strict=True
+                    )
+                ),
+                after(keyset[i][0], keyset[i][1], values[i]),
+            )
+            for i in range(len(keyset))
+        )
+    )
+
+
+def keyset_page(
+    rows: list[Row],
+    keyset: Keyset,
+    has_cursor: bool,
+    backwards: bool,
+    limit: int,
+    scalars: bool = True,
+) -> CursorPage:
+    """Return the page of rows fetched by `keyset_query`."""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    size = len(keyset)
+    next_cursor = prev_cursor = None
+    if rows and (backwards or has_more):
+        next_cursor = encode_cursor(rows[-1][-size:], backwards=False)
+    if rows and (has_more if backwards else has_cursor):
+        prev_cursor = encode_cursor(rows[0][-size:], backwards=True)
+
+    if scalars:
+        data = [row[0] for row in rows]
+    else:
+        data = [
+            dict(zip(row._fields[:-size], row[:-size], strict=True)) for row in rows
+        ]
+
+    return CursorPage(
+        data=data,
+        meta=CursorMeta(next_cursor=next_cursor, prev_cursor=prev_cursor),
+    )
+
+
+def paginate_keyset(
+    query: Select,
+    order_by: OrderBy,
+    session: SqlaSession,
+    cursor: str | None,
+    limit: int,
+    *,
+    scalars: bool = True,
+) -> CursorPage:
+    keyset = get_keyset(order_by)
+    values, backwards = decode_cursor(cursor, keyset) if cursor else (None, False)
+    query = query.order_by(None).order_by(*order_by)
+    result = session.execute(keyset_query(query, keyset, values, backwards, limit))
+    rows = list(result.unique() if scalars else result)
+    return keyset_page(rows, keyset, bool(cursor), backwards, limit, scalars)
+
+
+def KeysetPagination(
+    session_key: str = _DEFAULT_SESSION_KEY,
+    min_page_size: int = 10,
+    max_page_size: int = 100,
+) -> Callable[[SqlaSession, str | None, int], KeysetPaginateSignature]:
+    """Paginate a `Select` with cursors instead of offsets.
+
+    The query is ordered by the `order_by` expressions given to `paginate`, which must
+    order rows uniquely. Pages are selected by filtering on them, so that deep pages
+    are as fast as the first one.
+    """
+
+    def dependency(
+        session: SqlaSession = Depends(SessionDependency(key=session_key)),
+        cursor: str | None = Query(None),
+        limit: int = Query(min_page_size, ge=1, le=max_page_size),
+    ) -> KeysetPaginateSignature:
+        def paginate(query: Select, order_by: OrderBy, scalars=True) -> CursorPage:
+            return paginate_keyset(
+                query, order_by, session, cursor, limit, scalars=scalars
+            )
+
+        return paginate
+
+    return dependency
+
+
+KeysetPaginate = Annotated[KeysetPaginateSignature, Depends(KeysetPagination())]
@@ -0,0 +1,190 @@
+import itertools
+import re
+from collections.abc import Callable, Sequence
+from contextvars import ContextVar
+from weakref import WeakKeyDictionary
+
+import structlog
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import Select
+
+logger = structlog.get_logger(__name__)
+
+ReaderSelector = Callable[[], Engine]
+
+_LSN_REGEX = re.compile(r"^[0-9A-F]{1,8}/[0-9A-F]{1,8}$", re.IGNORECASE)
+
+# WAL position each engine key must have replayed to be read from, for current request
+required_lsns: ContextVar[dict[str, str] | None] = ContextVar(
+    "required_lsns", default=None
+)
+
+
+_autocommit_engines: "WeakKeyDictionary[Engine, Engine]" = WeakKeyDictionary()
+
+
+def is_lsn(value: str) -> bool:
+    return bool(_LSN_REGEX.match(value))
+
+
+def uses_writer(session) -> bool:
+    """Return whether session has readers and routes its statements to the writer."""
+    return bool(getattr(session, "readers", None)) and session.use_writer
+
+
+def get_current_lsn(session) -> str:
+    """Return the current WAL position of the writer of session.
+
+    It is read on an autocommit connection of the writer: executing it with session,
+    once committed, would begin a transaction only to end it when closing session.
+    """
+    query = text("select pg_current_wal_lsn()")
+    if isinstance(session.bind, Connection):
+        # it joins the transaction of the connection, like with the pytest plugin
+        return session.bind.execute(query).scalar_one()
+
+    with get_autocommit_engine(session.bind).connect() as connection:
+        return connection.execute(query).scalar_one()
+
+
+def has_replayed(engine: Engine, lsn: str) -> bool:
+    """Return whether engine db has replayed WAL up to lsn.
+
+    A db which is not a standby has nothing to replay: its current WAL position is used.
+    """
+    query = text(
+        "select coalesce(pg_last_wal_replay_lsn(), pg_current_wal_lsn()) "
+        ">= cast(:lsn as pg_lsn)"
+    )
+    with engine.connect() as connection:
+        return bool(connection.execute(query, {"lsn": lsn}).scalar())
+
+
+def set_read_only(session, deferrable: bool = False) -> None:
+    """Start the transactions of session with `SET TRANSACTION READ ONLY`.
+
+    It only applies to the transactions session begins afterwards.
+    """
+    session.info["read_only"] = True
+    session.info["read_only_deferrable"] = deferrable
+    event.listen(session, "after_begin", _set_transaction_read_only)
+
+
+def _set_transaction_read_only(session, transaction, connection) -> None:
+    if is_autocommit_connection(connection):
+        # there is no transaction to make read only
+        return
+
+    statement = "SET TRANSACTION READ ONLY"
+    if session.info.get("read_only_deferrable"):
+        statement += " DEFERRABLE"
+    connection.execute(text(statement))
+
+
+def get_autocommit_engine(engine: Engine) -> Engine:
+    """Return a copy of engine sharing its pool, whose connections autocommit."""
+    try:
+        return _autocommit_engines[engine]
+    except KeyError:
+        autocommit_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+        _autocommit_engines[engine] = autocommit_engine
+        return autocommit_engine
+
+
+def is_autocommit_connection(connection: Connection) -> bool:
+    """Return whether connection runs statements without transaction."""
+    return connection.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+
+
+def round_robin(readers: Sequence[Engine]) -> ReaderSelector:
+    """Select readers in turn."""
+    cycle = itertools.cycle(readers)
+    return lambda: next(cycle)
+
+
+def least_checked_out(readers: Sequence[Engine]) -> ReaderSelector:
+    """Select the reader with the fewest connections checked out of its pool."""
+
+    def checked_out(engine: Engine) -> int:
+        checkedout = getattr(engine.pool, "checkedout", None)
+        return checkedout() if checkedout else 0
+
+    return lambda: min(readers, key=checked_out)
+
+
+READER_SELECTORS: dict[str, Callable[[Sequence[Engine]], ReaderSelector]] = {
+    "round_robin": round_robin,
+    "least_checked_out": least_checked_out,
+}
+
+
+class ReaderRoutingMixin:
+    """Session mixin routing reads to a reader engine and writes to the writer one.
+
+    A statement is routed to a reader when it is a `SELECT` without `FOR UPDATE` and
+    the session has no pending changes. Any other statement, as well as flushes, is
+    routed to the writer bound to the session, which is then used for the rest of the
+    session, so that it reads its own writes. The reader is selected once per session.
+
+    When `required_lsns` holds a WAL position for the session engine key, the selected
+    reader is only used if it has replayed up to it, else reads go to the writer.
+
+    A read only session, see `set_read_only`, routes any statement to the reader as
+    long as it has no pending changes. An autocommit session reads from the autocommit
+    copy of the reader, see `get_autocommit_engine`.
+    """
+
+    def __init__(
+        self,
+        *args,
+        engine_key: str | None = None,
+        readers: Sequence[Engine] = (),
+        select_reader: ReaderSelector | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.engine_key = engine_key
+        self.readers = readers
+        self.use_writer = not readers
+        self._select_reader = select_reader or round_robin(readers)
+        self._reader: Engine | None = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.use_writer or not self._is_read(clause):
+            self.use_writer = True
+            return super().get_bind(mapper, clause=clause, **kwargs)  # type: ignore
+
+        if self._reader is None:
+            self._reader = self._select_reader()
+            if not self._is_consistent(self._reader):
+                self.use_writer = True
+                return super().get_bind(mapper, clause=clause, **kwargs)  # type: ignore
+
+            if self.info.get("autocommit"):  # type: ignore
+                self._reader = get_autocommit_engine(self._reader)
+
+        return self._reader
+
+    def _is_consistent(self, reader: Engine) -> bool:
+        lsn = (required_lsns.get() or {}).get(self.engine_key)  # type: ignore
+        if not lsn:
+            return True
+
+        try:
+            return has_replayed(reader, lsn)
+        except Exception:
+            logger.warning("failed checking reader replay lsn", exc_info=True)
+            return False
+
+    def _is_read(self, clause) -> bool:
+        if self._flushing or self.new or self.dirty or self.deleted:  # type: ignore
+            return False
+
+        if self.info.get("read_only"):  # type: ignore
+            return True
+
+        return (
+            isinstance(clause, Select)
+            and getattr(clause, "_for_update_arg", None) is None
+        )
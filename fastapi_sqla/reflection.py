@@ -0,0 +1,360 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections.abc import Generator, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any
+
+import sqlalchemy
+import structlog
+from sqlalchemy import MetaData, Table, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm.exc import UnmappedClassError
+
+logger = structlog.get_logger(__name__)
+
+# Serializes reflection of bases, by engine keys started concurrently or lazily
+lock = threading.Lock()
+_local = threading.local()
+
+# Reflected tables are only loaded into the metadata of a base before mapping its
+# classes with sqlalchemy 2.0, where DeferredReflection reflects using MetaData.reflect
+SUPPORTS_SNAPSHOTS = int(sqlalchemy.__version__.split(".")[0]) >= 2
+
+# Checksum of the definitions of columns, constraints, indexes and enums of all schemas
+_CATALOG_CHECKSUM = text(
+    """
+    SELECT md5(string_agg(definition, ';' ORDER BY definition)) FROM (
+        SELECT concat_ws(
+            ':', table_schema, table_name, column_name, ordinal_position, data_type,
+            udt_name, is_nullable, column_default, character_maximum_length,
+            numeric_precision, numeric_scale
+        ) AS definition
+        FROM information_schema.columns
+        WHERE table_schema NOT IN ('pg_catalog', 'information_schema')
+        UNION ALL
+        SELECT concat_ws(
+            ':', n.nspname, r.relname, c.conname, pg_get_constraintdef(c.oid)
+        )
+        FROM pg_constraint c
+        JOIN pg_class r ON r.oid = c.conrelid
+        JOIN pg_namespace n ON n.oid = c.connamespace
+        WHERE n.nspname NOT IN ('pg_catalog', 'information_schema')
+        UNION ALL
+        SELECT concat_ws(':', schemaname, indexdef)
+        FROM pg_indexes
+        WHERE schemaname NOT IN ('pg_catalog', 'information_schema')
+        UNION ALL
+        SELECT concat_ws(':', n.nspname, t.typname, e.enumsortorder, e.enumlabel)
+        FROM pg_enum e
+        JOIN pg_type t ON t.oid = e.enumtypid
+        JOIN pg_namespace n ON n.oid = t.typnamespace
+    ) AS catalog
+    """
+)
+
+
+def is_mapped(cls: type) -> bool:
+    """Return whether cls is mapped: deferred classes are not until prepared."""
+    try:
+        return inspect(cls, raiseerr=False) is not None
+    except UnmappedClassError:
+        return False
+
+
+def get_deferred_tables(base: type) -> list[Table]:
+    """Return the tables of the classes deriving from base which are not mapped yet."""
+    tables: dict[str, Table] = {}
+    classes: list[type] = list(base.__subclasses__())
+    while classes:
+        cls = classes.pop()
+        classes.extend(cls.__subclasses__())
+        table = cls.__dict__.get("__table__")
+        if isinstance(table, Table) and not is_mapped(cls):
+            tables[table.key] = table
+
+    return list(tables.values())
+
+
+def get_fingerprint(connection: Connection, tables: list[Table]) -> str | None:
+    """Return a fingerprint of the db schema and tables, None if not supported.
+
+    It changes whenever the definition of any table changes, as well as the tables to
+    reflect or the sqlalchemy version.
+    """
+    if connection.dialect.name != "postgresql":
+        return None
+
+    checksum = connection.execute(_CATALOG_CHECKSUM).scalar() or ""
+    names = sorted(f"{table.schema}.{table.name}" for table in tables)
+    content = "\n".join([sqlalchemy.__version__, checksum, *names])
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def get_snapshot_path(
+    connection: Connection, tables: list[Table], cache_dir: str
+) -> str | None:
+    """Return the path of the snapshot of tables in cache_dir, None if not supported."""
+    fingerprint = get_fingerprint(connection, tables)
+    if fingerprint is None:
+        return None
+
+    return os.path.join(cache_dir, f"fastapi_sqla_{fingerprint}.pickle")
+
+
+def reflect(connection: Connection, tables: list[Table]) -> MetaData:
+    """Reflect tables, and the tables they refer to, into a new metadata.
+
+    With sqlalchemy 2.0, tables of each schema are reflected with bulk catalog queries.
+    """
+    names_by_schema: dict[str | None, list[str]] = {}
+    for table in tables:
+        names_by_schema.setdefault(table.schema, []).append(table.name)
+
+    metadata = MetaData()
+    for schema, names in names_by_schema.items():
+        metadata.reflect(connection, schema=schema, only=names)
+
+    return metadata
+
+
+def split(tables: list[Table], batches: int) -> list[list[Table]]:
+    """Split tables into at most `batches` batches of similar sizes."""
+    tables = sorted(tables, key=lambda table: (table.schema or "", table.name))
+    return [batch for batch in (tables[i::batches] for i in range(batches)) if batch]
+
+
+def combine(metadatas: Iterable[MetaData]) -> MetaData:
+    """Return a metadata with the tables of metadatas, reflected concurrently."""
+    combined = MetaData()
+    for metadata in metadatas:
+        for table in metadata.tables.values():
+            if table.key not in combined.tables:
+                table.to_metadata(combined)
+
+    return combined
+
+
+def reflect_concurrently(engine: Engine, tables: list[Table], batches: int) -> MetaData:
+    """Reflect tables in batches, each on its own connection of engine, in threads."""
+
+    def reflect_batch(batch: list[Table]) -> MetaData:
+        with engine.connect() as connection:
+            return reflect(connection, batch)
+
+    table_batches = split(tables, batches)
+    if len(table_batches) == 1:
+        return reflect_batch(tables)
+
+    with ThreadPoolExecutor(
+        max_workers=len(table_batches), thread_name_prefix="fastapi_sqla_reflection"
+    ) as executor:
+        return combine(executor.map(reflect_batch, table_batches))
+
+
+def load_snapshot(path: str) -> MetaData | None:
+    """Return the metadata saved at path, None if there is none or it is invalid.
+
+    Snapshots are pickled, as metadata has no other serialization: the directory they
+    are saved in must be trusted, see `save_snapshot`.
+    """
+    try:
+        with open(path, "rb") as file:
+            # Only loads snapshots of the configured cache directory, see docstring
+            snapshot = pickle.load(file)  # noqa: S301
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.warning("invalid reflection snapshot", path=path, exc_info=True)
+        return None
+
+    return snapshot if isinstance(snapshot, MetaData) else None
+
+
+def save_snapshot(path: str, snapshot: MetaData) -> None:
+    """Save snapshot at path atomically, logging instead of failing on error.
+
+    The file is only readable and writable by the user of the process.
+    """
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            pickle.dump(snapshot, file)
+        os.replace(tmp_path, path)
+    except OSError:
+        logger.warning("reflection snapshot not saved", path=path, exc_info=True)
+
+
+def merge(snapshot: MetaData, metadata: MetaData, tables: list[Table]) -> None:
+    """Merge the reflected tables of snapshot into metadata.
+
+    Snapshot tables missing from metadata are copied to it, and tables to reflect are
+    extended with the columns and foreign keys they do not declare.
+    """
+    keys = {table.key for table in tables}
+    for reflected in snapshot.tables.values():
+        table = metadata.tables.get(reflected.key)
+        if table is None:
+            reflected.to_metadata(metadata)
+        elif table.key in keys:
+            names = {column.name for column in table.columns}
+            for column in reflected.columns:
+                if column.name not in names:
+                    table.append_column(column._copy())
+
+            for constraint in reflected.foreign_key_constraints:
+                if not names & set(constraint.column_keys):
+                    table.append_constraint(constraint._copy())
+
+
+def map_classes(base, engine: Engine) -> None:
+    """Map the deferred classes of base to tables already merged into its metadata.
+
+    Only tables missing from the metadata, like secondary tables of relationships, are
+    reflected.
+    """
+    metadata = base.metadata
+
+    def reflect_missing(bind, schema=None, only=(), **kwargs):
+        missing = [
+            name
+            for name in only
+            if not _has_columns(metadata, f"{schema}.{name}" if schema else name)
+        ]
+        if missing:
+            MetaData.reflect(metadata, bind, schema=schema, only=missing, **kwargs)
+
+    metadata.reflect = reflect_missing  # type: ignore[method-assign]
+    try:
+        base.prepare(engine)
+    finally:
+        del metadata.reflect
+
+
+def _has_columns(metadata: MetaData, key: str) -> bool:
+    table = metadata.tables.get(key)
+    return table is not None and len(table.columns) > 0
+
+
+@contextmanager
+def reflecting() -> Generator[None, None, None]:
+    """Disable lazy reflection in current thread while classes are being mapped."""
+    previous, _local.reflecting = getattr(_local, "reflecting", False), True
+    try:
+        yield
+    finally:
+        _local.reflecting = previous
+
+
+def load(base, engine: Engine, snapshot: MetaData, tables: list[Table]) -> None:
+    """Merge snapshot into the metadata of base and map its deferred classes."""
+    with reflecting():
+        merge(snapshot, base.metadata, tables)
+        map_classes(base, engine)
+
+
+def prepare(
+    base, engine: Engine, cache_dir: str | None = None, concurrency: int = 1
+) -> None:
+    """Reflect the deferred classes of base, like `base.prepare(engine)`.
+
+    With `cache_dir`, reflected tables are saved in it, in a snapshot file named after
+    the fingerprint of the db schema, and loaded from it instead of reflected while the
+    fingerprint matches.
+
+    With `concurrency`, tables are reflected in as many batches, concurrently.
+    """
+    with reflecting():
+        if not SUPPORTS_SNAPSHOTS or (not cache_dir and concurrency < 2):
+            base.prepare(engine)
+            return
+
+        tables = get_deferred_tables(base)
+        if not tables:
+            base.prepare(engine)
+            return
+
+        path = None
+        if cache_dir:
+            with engine.connect() as connection:
+                path = get_snapshot_path(connection, tables, cache_dir)
+
+        snapshot = load_snapshot(path) if path else None
+        if snapshot is not None:
+            logger.info("reflection snapshot loaded", path=path)
+        elif path or concurrency > 1:
+            snapshot = reflect_concurrently(engine, tables, concurrency)
+            if path:
+                save_snapshot(path, snapshot)
+        else:
+            base.prepare(engine)
+            return
+
+        load(base, engine, snapshot, tables)
+
+
+class LazyReflection:
+    """Base and engine of lazy reflection, see `enable_lazy_reflection`."""
+
+    def __init__(self) -> None:
+        self.base: type | None = None
+        self.engine: Engine | None = None
+
+
+_lazy = LazyReflection()
+
+
+def enable_lazy_reflection(base: type, engine: Engine) -> None:
+    """Reflect the deferred classes of base with engine on their first use.
+
+    See `reflect_lazily`.
+    """
+    _lazy.base, _lazy.engine = base, engine
+
+
+def reflect_lazily(cls: type) -> bool:
+    """Reflect cls if it is pending lazy reflection, and return whether it was.
+
+    Classes deriving from the same abstract class of the base are reflected together,
+    so that relationships between them can be configured.
+    """
+    base, engine = _lazy.base, _lazy.engine
+    if (
+        base is None
+        or getattr(_local, "reflecting", False)
+        or not issubclass(cls, base)
+        or not _is_pending(cls)
+    ):
+        return False
+
+    with lock:
+        if _is_pending(cls):
+            with reflecting():
+                group: Any = _get_group(base, cls)
+                group.prepare(engine)
+
+            logger.info("lazy reflection", cls=cls.__name__)
+
+    return True
+
+
+def _is_pending(cls: type) -> bool:
+    return isinstance(cls.__dict__.get("__table__"), Table) and not is_mapped(cls)
+
+
+def _get_group(base: type, cls: type) -> type:
+    """Return the topmost abstract class of base cls derives from, or cls."""
+    for ancestor in reversed(cls.__mro__):
+        if (
+            ancestor is not base
+            and issubclass(ancestor, base)
+            and ancestor.__dict__.get("__abstract__")
+        ):
+            return ancestor
+
+    return cls
@@ -1,25 +1,47 @@
 import asyncio
+import contextvars
+import functools
 import os
-from collections.abc import Generator
-from contextlib import contextmanager
-from typing import Annotated
+import threading
+import time
+from collections import Counter, defaultdict
+from collections.abc import AsyncGenerator, Callable, Generator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import (
+    AbstractAsyncContextManager,
+    AbstractContextManager,
+    ExitStack,
+    asynccontextmanager,
+    contextmanager,
+    suppress,
+)
+from typing import Annotated, Any, TypeVar
 
 import structlog
-from fastapi import Depends, Request, Response
-from fastapi.concurrency import contextmanager_in_threadpool
-from fastapi.responses import PlainTextResponse
+from fastapi import Depends, Request
+from fastapi.responses import PlainTextResponse, Response
 from pydantic import BaseModel
 from sqlalchemy import engine_from_config, text
-from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.engine import Connection, Engine, make_url
 from sqlalchemy.ext.declarative import DeferredReflection
 from sqlalchemy.orm.session import Session as SqlaSession
 from sqlalchemy.orm.session import sessionmaker
+from sqlalchemy.pool import QueuePool
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from fastapi_sqla import aws_aurora_support, aws_rds_iam_support
+from fastapi_sqla import (
+    admission,
+    aws_aurora_support,
+    aws_rds_iam_support,
+    disconnect,
+    metrics,
+    read_replicas,
+    reflection,
+    statement_timeout,
+)
 
 try:
-    from sqlalchemy.orm import DeclarativeBase
+    from sqlalchemy.orm import DeclarativeBase  # type: ignore[assignment]
 except ImportError:
     from sqlalchemy.ext.declarative import declarative_base
 
@@ -37,6 +59,16 @@ logger = structlog.get_logger(__name__)
 _DEFAULT_SESSION_KEY = "default"
 _REQUEST_SESSION_KEY = "fastapi_sqla_session"
 _session_factories: dict[str, sessionmaker] = {}
+_middleware_counters: defaultdict[str, Counter] = defaultdict(Counter)
+_executors: dict[str, "SessionExecutor"] = {}
+_bulkhead_engines: dict[str, dict[str, Engine]] = {}
+# Engine of each key created by startup, and engine config of each key, by key
+_engines: dict[str, Engine | Connection] = {}
+_engine_configs: dict[str, dict[str, str | bool]] = {}
+_prepare_lock = reflection.lock
+_SAFE_METHODS = frozenset({"GET", "HEAD"})
+
+T = TypeVar("T")
 
 
 class _EngineConfig(BaseModel):
@@ -48,10 +80,39 @@ class _EngineConfig(BaseModel):
         extra = "allow"
 
 
-class Base(DeclarativeBase, DeferredReflection):
+class _LazyReflectionMeta(type(DeclarativeBase)):  # type: ignore[misc]
+    """Reflect classes pending lazy reflection on first use, see `reflect_lazily`.
+
+    Classes are used when instantiated or when accessing their public attributes, which
+    `select` and `Session.query` do through `__clause_element__`.
+
+    `__getattr__` is only called for attributes classes do not have: the columns of
+    classes pending reflection, and the probes of sqlalchemy and other libraries, like
+    `__clause_element__` on already mapped classes. Without lazy reflection, or once
+    reflected, it costs a function call to these lookups and to instantiation.
+    """
+
+    def __getattr__(cls, name):
+        if (
+            name == "__clause_element__" or not name.startswith("_")
+        ) and reflection.reflect_lazily(cls):
+            return getattr(cls, name)
+
+        raise AttributeError(f"type object '{cls.__name__}' has no attribute '{name}'")
+
+    def __call__(cls, *args, **kwargs):
+        reflection.reflect_lazily(cls)
+        return super().__call__(*args, **kwargs)
+
+
+class Base(DeclarativeBase, DeferredReflection, metaclass=_LazyReflectionMeta):
     __abstract__ = True
 
 
+class RoutingSession(read_replicas.ReaderRoutingMixin, SqlaSession):
+    """Session routing reads to reader engines, see `ReaderRoutingMixin`."""
+
+
 def get_envvar_prefix(key: str) -> str:
     envvar_prefix = "sqlalchemy_"
     if key != _DEFAULT_SESSION_KEY:
@@ -60,11 +121,34 @@ def get_envvar_prefix(key: str) -> str:
     return envvar_prefix
 
 
+def get_option(key: str, name: str, default: str | None = None) -> str | None:
+    """Return a fastapi-sqla option for an engine key from environment variables.
+
+    Options are read from `fastapi_sqla_{name}` for the default key and from
+    `fastapi_sqla__{key}__{name}` for other keys.
+    """
+    envvar = f"fastapi_sqla_{name}"
+    if key != _DEFAULT_SESSION_KEY:
+        envvar = f"fastapi_sqla__{key}__{name}"
+
+    return get_lowercase_environ().get(envvar, default)
+
+
+@functools.cache
+def get_lowercase_environ() -> dict[str, str]:
+    """Return environment variables by lowercased name.
+
+    It is computed once and cleared by `startup`, to apply environment changes. It must
+    not be mutated.
+    """
+    return {k.lower(): v for k, v in os.environ.items()}
+
+
 def _get_engine_config(
     envvar_prefix: str,
 ) -> dict[str, str | bool]:
     """Build engine config dict with opinionated defaults and type coercion."""
-    lowercase_env: dict[str, str | bool] = {k.lower(): v for k, v in os.environ.items()}
+    lowercase_env: dict[str, str | bool] = dict(get_lowercase_environ())
     lowercase_env.pop(f"{envvar_prefix}warn_20", None)
 
     overrides = {
@@ -79,21 +163,448 @@ def _get_engine_config(
     return lowercase_env
 
 
+def get_engine_config(key: str = _DEFAULT_SESSION_KEY) -> dict[str, str | bool]:
+    """Return the engine config of key, parsed from environment variables once.
+
+    `startup` parses it again, to apply environment changes. It must not be mutated.
+    """
+    if key not in _engine_configs:
+        _engine_configs[key] = _get_engine_config(get_envvar_prefix(key))
+
+    return _engine_configs[key]
+
+
+def is_async_key(key: str = _DEFAULT_SESSION_KEY) -> bool:
+    """Return whether the url of key uses an `asyncio` driver, without any engine."""
+    url = get_engine_config(key)[f"{get_envvar_prefix(key)}url"]
+    if not isinstance(url, str):
+        raise TypeError(f"The sqlalchemy url of key '{key}' must be a string.")
+
+    return getattr(make_url(url).get_dialect(), "is_async", False)
+
+
+def get_engine(key: str = _DEFAULT_SESSION_KEY) -> Engine | Connection:
+    """Return the engine of key created by `startup`."""
+    try:
+        return _engines[key]
+    except KeyError as exc:
+        raise KeyError(
+            f"No engine with key '{key}' found, "
+            "please ensure you've configured the environment variables for this key."
+        ) from exc
+
+
+def get_middleware_stats(key: str = _DEFAULT_SESSION_KEY) -> dict[str, int]:
+    """Return how many commits and rollbacks session middlewares ran or skipped.
+
+    It also returns how many requests were shed by the admission controller of key.
+    """
+    counters = _middleware_counters[key]
+    return {
+        name: counters[name]
+        for name in (
+            "commits",
+            "commits_skipped",
+            "rollbacks",
+            "rollbacks_skipped",
+            "shed",
+        )
+    }
+
+
+def has_changes(session: SqlaSession) -> bool:
+    return bool(session.dirty or session.deleted or session.new)
+
+
+def is_read_only(session: SqlaSession) -> bool:
+    return bool(session.info.get("read_only"))
+
+
+def is_autocommit(session: SqlaSession) -> bool:
+    return bool(session.info.get("autocommit"))
+
+
+def is_clean(session: SqlaSession) -> bool:
+    """Return True when session has no pending changes and no transaction begun.
+
+    Committing or rolling back such a session is a no-op. A read only or autocommit
+    session without pending changes is clean as well: closing it ends its transaction.
+    """
+    if has_changes(session):
+        return False
+
+    if is_read_only(session) or is_autocommit(session):
+        return True
+
+    # sqlalchemy 1.3 sessions have no `in_transaction` and always have a transaction
+    in_transaction = getattr(session, "in_transaction", None)
+    return in_transaction is not None and not in_transaction()
+
+
+def is_lazy_session_enabled() -> bool:
+    return get_lowercase_environ().get("fastapi_sqla_lazy_session_enabled") == "true"
+
+
+def is_lazy_reflection_enabled(key: str) -> bool:
+    return get_option(key, "lazy_reflection") == "true"
+
+
+def is_cancel_on_disconnect_enabled(key: str) -> bool:
+    return get_option(key, "cancel_on_disconnect") == "true"
+
+
+def is_read_only_enabled(key: str) -> bool:
+    return get_option(key, "read_only_safe_methods") == "true"
+
+
+def make_read_only(session: SqlaSession, key: str) -> None:
+    """Start the transactions of session as read only, unless one is already begun."""
+    if is_read_only(session):
+        return
+
+    # sqlalchemy 1.3 sessions have no `in_transaction` and always have a transaction
+    in_transaction = getattr(session, "in_transaction", None)
+    if in_transaction is None or in_transaction():
+        logger.warning(
+            "session transaction already begun, it is not read only", engine_key=key
+        )
+        return
+
+    if isinstance(session.bind, Connection):
+        # it joins the transaction of the connection, like with the pytest plugin
+        return
+
+    deferrable = get_option(key, "read_only_deferrable") == "true"
+    read_replicas.set_read_only(session, deferrable=deferrable)
+
+
+def make_autocommit(session: SqlaSession, key: str) -> None:
+    """Run session statements on autocommit connections, without BEGIN nor COMMIT.
+
+    Each statement, including the ones flushing pending changes, is committed on its
+    own. It only applies to a session which did not begin a transaction yet.
+    """
+    if is_autocommit(session):
+        return
+
+    in_transaction = getattr(session, "in_transaction", None)
+    if in_transaction is None or in_transaction():
+        logger.warning(
+            "session transaction already begun, it is not autocommit", engine_key=key
+        )
+        return
+
+    if isinstance(session.bind, Connection):
+        return
+
+    session.info["autocommit"] = True
+    session.bind = read_replicas.get_autocommit_engine(session.bind)  # type: ignore
+
+
+def get_admission_controller(key: str) -> admission.AdmissionController | None:
+    """Return the admission controller of key, None when `max_sessions` is not set.
+
+    The session limit of the controller is autotuned when the `autotune` option of key
+    is `true`.
+    """
+    max_sessions = get_option(key, "max_sessions")
+    if not max_sessions:
+        return None
+
+    autotuner = None
+    if get_option(key, "autotune") == "true":
+        autotuner = admission.Autotuner(
+            key,
+            functools.partial(metrics.get_checkout_wait, key),
+            min_sessions=int(get_option(key, "autotune_min_sessions", "1") or "1"),
+            target_wait_ms=float(
+                get_option(key, "autotune_target_wait_ms", "10") or "10"
+            ),
+            interval_s=float(get_option(key, "autotune_interval", "5") or "5"),
+        )
+
+    max_queued = get_option(key, "max_queued_sessions")
+    max_wait_ms = get_option(key, "max_session_wait_ms")
+    controller = admission.AdmissionController(
+        int(max_sessions),
+        max_queued=int(max_queued) if max_queued else None,
+        max_wait_ms=float(max_wait_ms) if max_wait_ms else None,
+        retry_after=int(get_option(key, "retry_after", "1") or "1"),
+        autotuner=autotuner,
+    )
+    admission.controllers[key] = controller
+    return controller
+
+
+def get_slow_checkout_logger(key: str) -> metrics.SlowCheckoutLogger | None:
+    """Return the logger of slow pool checkouts of key, None when not configured."""
+    threshold_ms = get_option(key, "slow_checkout_threshold_ms")
+    if not threshold_ms:
+        return None
+
+    interval_s = get_option(key, "slow_checkout_log_interval", "1") or "1"
+    return metrics.SlowCheckoutLogger(float(threshold_ms), float(interval_s))
+
+
+def use_bulkhead(session: SqlaSession, key: str, name: str) -> None:
+    """Bind session to the engine of bulkhead name of key, with its own pool.
+
+    A session bound to a bulkhead does not read from readers. It only applies to a
+    session which did not begin a transaction yet.
+    """
+    try:
+        engine = _bulkhead_engines[key][name]
+    except KeyError as exc:
+        raise KeyError(
+            f"No bulkhead '{name}' found for key '{key}', "
+            "please ensure you've configured the `bulkheads` option of this key."
+        ) from exc
+
+    if session.info.get("bulkhead") == name:
+        return
+
+    in_transaction = getattr(session, "in_transaction", None)
+    if in_transaction is None or in_transaction():
+        logger.warning(
+            "session transaction already begun, it is not bound to bulkhead",
+            engine_key=key,
+            bulkhead=name,
+        )
+        return
+
+    if isinstance(session.bind, Connection):
+        return
+
+    session.info["bulkhead"] = name
+    session.bind = engine
+    if getattr(session, "readers", None):
+        session.use_writer = True  # type: ignore[attr-defined]
+
+
 def new_engine(key: str = _DEFAULT_SESSION_KEY) -> Engine | Connection:
+    return engine_from_config(get_engine_config(key), prefix=get_envvar_prefix(key))
+
+
+def get_reader_configs(key: str = _DEFAULT_SESSION_KEY) -> list[dict[str, str | bool]]:
+    """Return engine configs of the readers of key, one per url in `reader_urls`.
+
+    Readers share the engine configuration of the writer, except for the url.
+    """
+    reader_urls = get_option(key, "reader_urls")
+    if not reader_urls:
+        return []
+
+    envvar_prefix = get_envvar_prefix(key)
+    config = get_engine_config(key)
+    return [
+        {**config, f"{envvar_prefix}url": url.strip()}
+        for url in reader_urls.split(",")
+        if url.strip()
+    ]
+
+
+def get_bulkhead_configs(
+    key: str = _DEFAULT_SESSION_KEY,
+) -> dict[str, dict[str, str | bool]]:
+    """Return engine configs of the bulkheads of key, by bulkhead name.
+
+    The `bulkheads` option of key is a comma separated list of `name=pool_size`.
+    Bulkheads share the engine configuration of the key, except for their pool, which
+    does not overflow.
+    """
+    bulkheads = get_option(key, "bulkheads")
+    if not bulkheads:
+        return {}
+
+    envvar_prefix = get_envvar_prefix(key)
+    config = get_engine_config(key)
+    configs = {}
+    for bulkhead in bulkheads.split(","):
+        name, _, pool_size = (part.strip() for part in bulkhead.partition("="))
+        if not name or not pool_size.isdigit():
+            raise ValueError(
+                f"Invalid bulkhead '{bulkhead}' for key '{key}', "
+                "expected 'name=pool_size'."
+            )
+
+        configs[name] = {
+            **config,
+            f"{envvar_prefix}pool_size": pool_size,
+            f"{envvar_prefix}max_overflow": "0",
+        }
+
+    return configs
+
+
+def new_bulkhead_engines(key: str = _DEFAULT_SESSION_KEY) -> dict[str, Engine]:
+    envvar_prefix = get_envvar_prefix(key)
+    return {
+        name: engine_from_config(config, prefix=envvar_prefix)
+        for name, config in get_bulkhead_configs(key).items()
+    }
+
+
+def new_reader_engines(key: str = _DEFAULT_SESSION_KEY) -> list[Engine]:
     envvar_prefix = get_envvar_prefix(key)
-    config = _get_engine_config(envvar_prefix)
-    return engine_from_config(config, prefix=envvar_prefix)
+    return [
+        engine_from_config(config, prefix=envvar_prefix)
+        for config in get_reader_configs(key)
+    ]
+
+
+def get_reader_selector(key: str, readers: list) -> read_replicas.ReaderSelector | None:
+    """Return the function selecting a reader for a new session of key."""
+    if not readers:
+        return None
+
+    routing = get_option(key, "reader_routing", "round_robin") or "round_robin"
+    try:
+        return read_replicas.READER_SELECTORS[routing](readers)
+    except KeyError as exc:
+        raise ValueError(
+            f"Unknown reader routing '{routing}' for key '{key}', expected one of "
+            f"{sorted(read_replicas.READER_SELECTORS)}."
+        ) from exc
+
+
+class SessionExecutor(ThreadPoolExecutor):
+    """Thread pool executor dedicated to the sessions of one engine key.
+
+    It keeps track of submitted tasks not done yet, to expose its queue depth.
+    """
+
+    def __init__(self, key: str, max_workers: int | None = None) -> None:
+        super().__init__(
+            max_workers=max_workers, thread_name_prefix=f"fastapi_sqla_{key}"
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = super().submit(fn, *args, **kwargs)
+        except BaseException:
+            self._task_done()
+            raise
+        future.add_done_callback(self._task_done)
+        return future
+
+    def _task_done(self, future: Future | None = None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "max_workers": self._max_workers,
+            "in_flight": self._in_flight,
+            "queue_depth": self._work_queue.qsize(),
+        }
+
+
+def get_pool_capacity(engine: Engine) -> int | None:
+    """Return the max number of connections of engine pool, None when unbounded."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool) or pool._max_overflow < 0:
+        return None
+
+    return pool.size() + pool._max_overflow
+
+
+def get_prewarm_connections(key: str, engine: Engine) -> int:
+    """Return how many connections to open at startup, from `prewarm_connections`.
+
+    It is capped to the pool size of engine: overflow connections are not kept.
+    """
+    connections = int(get_option(key, "prewarm_connections", "0") or "0")
+    size = getattr(engine.pool, "size", None)
+    return min(connections, size()) if size else connections
+
+
+def get_reflection_concurrency(key: str, engine: Engine) -> int:
+    """Return in how many batches to reflect tables, from `reflection_concurrency`.
+
+    It is capped to the pool capacity of engine, as each batch uses a connection.
+    """
+    concurrency = int(get_option(key, "reflection_concurrency", "1") or "1")
+    capacity = get_pool_capacity(engine)
+    return min(concurrency, capacity) if capacity else concurrency
+
+
+def prewarm(engine: Engine, connections: int) -> None:
+    """Open connections concurrently and check them in the pool of engine."""
+    if connections <= 0:
+        return
+
+    with ThreadPoolExecutor(
+        max_workers=connections, thread_name_prefix="fastapi_sqla_prewarm"
+    ) as executor:
+        opened = list(
+            executor.map(lambda _: engine.raw_connection(), range(connections))
+        )
+
+    for connection in opened:
+        connection.close()
+
+
+def get_executor_stats(key: str = _DEFAULT_SESSION_KEY) -> dict[str, int]:
+    """Return max workers, tasks in flight and queue depth of executor for key."""
+    return _executors[key].stats()
+
+
+async def run_in_executor(key: str, func: Callable[..., T], *args: Any) -> T:
+    """Run func in the executor dedicated to key, or in the loop default one."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _executors.get(key), functools.partial(context.run, func, *args)
+    )
+
+
+@asynccontextmanager
+async def contextmanager_in_executor(
+    key: str, cm: AbstractContextManager[T]
+) -> AsyncGenerator[T, None]:
+    """Enter and exit a sync context manager in the executor dedicated to key."""
+    try:
+        yield await run_in_executor(key, cm.__enter__)
+    except Exception as exc:
+        suppressed = await run_in_executor(
+            key, cm.__exit__, type(exc), exc, exc.__traceback__
+        )
+        if not suppressed:
+            raise
+    else:
+        await run_in_executor(key, cm.__exit__, None, None, None)
 
 
 def startup(key: str = _DEFAULT_SESSION_KEY):
-    engine_or_connection = new_engine(key)
-    aws_rds_iam_support.setup(engine_or_connection.engine)
-    aws_aurora_support.setup(engine_or_connection.engine)
+    get_lowercase_environ.cache_clear()
+    _engine_configs.pop(key, None)
+    engine_or_connection = _engines[key] = new_engine(key)
+    readers = new_reader_engines(key)
+    bulkheads = new_bulkhead_engines(key)
+    for engine in [engine_or_connection.engine, *readers, *bulkheads.values()]:
+        aws_rds_iam_support.setup(engine)
+        aws_aurora_support.setup(engine)
+
+    slow_checkouts = get_slow_checkout_logger(key)
+    metrics.instrument(key, engine_or_connection.engine, slow_checkouts=slow_checkouts)
+    for i, reader in enumerate(readers):
+        metrics.instrument(
+            key, reader, name=f"reader_{i}", slow_checkouts=slow_checkouts
+        )
+    for name, bulkhead in bulkheads.items():
+        metrics.instrument(
+            key, bulkhead, name=f"bulkhead_{name}", slow_checkouts=slow_checkouts
+        )
 
     # Fail early
     try:
-        with engine_or_connection.engine.connect() as connection:
-            connection.execute(text("select 'OK'"))
+        for engine in [engine_or_connection.engine, *readers]:
+            with engine.connect() as connection:
+                connection.execute(text("select 'OK'"))
     except Exception:
         logger.critical(
             f"Failed querying db for key '{key}': "
@@ -101,21 +612,68 @@ def startup(key: str = _DEFAULT_SESSION_KEY):
         )
         raise
 
-    Base.prepare(engine_or_connection.engine)
+    for engine in [engine_or_connection.engine, *readers]:
+        prewarm(engine, get_prewarm_connections(key, engine))
 
-    _session_factories[key] = sessionmaker(
-        bind=engine_or_connection, class_=SqlaSession
+    if is_lazy_reflection_enabled(key):
+        reflection.enable_lazy_reflection(Base, engine_or_connection.engine)
+    else:
+        with _prepare_lock:
+            reflection.prepare(
+                Base,
+                engine_or_connection.engine,
+                cache_dir=get_option(key, "reflection_cache_dir"),
+                concurrency=get_reflection_concurrency(
+                    key, engine_or_connection.engine
+                ),
+            )
+
+    if readers:
+        _session_factories[key] = sessionmaker(
+            bind=engine_or_connection,
+            class_=RoutingSession,
+            engine_key=key,
+            readers=readers,
+            select_reader=get_reader_selector(key, readers),
+        )
+    else:
+        _session_factories[key] = sessionmaker(
+            bind=engine_or_connection, class_=SqlaSession
+        )
+
+    _bulkhead_engines[key] = bulkheads
+
+    if is_cancel_on_disconnect_enabled(key):
+        disconnect.track_connections(_session_factories[key])
+
+    previous_executor = _executors.pop(key, None)
+    if previous_executor:
+        previous_executor.shutdown(wait=False)
+    _executors[key] = SessionExecutor(
+        key, max_workers=get_pool_capacity(engine_or_connection.engine)
     )
 
-    logger.info("engine startup", engine_key=key, engine=engine_or_connection)
+    logger.info(
+        "engine startup",
+        engine_key=key,
+        engine=engine_or_connection,
+        readers=len(readers),
+        bulkheads=sorted(bulkheads),
+    )
 
 
 @contextmanager
-def open_session(key: str = _DEFAULT_SESSION_KEY) -> Generator[SqlaSession, None, None]:
+def open_session(
+    key: str = _DEFAULT_SESSION_KEY, read_only: bool = False, autocommit: bool = False
+) -> Generator[SqlaSession, None, None]:
     """Context manager that opens a session and properly closes session when exiting.
 
     If no exception is raised before exiting context, session is committed when exiting
     context. If an exception is raised, session is rollbacked.
+
+    When `read_only` is set, the session transactions are read only. When `autocommit`
+    is set, the session runs statements without transaction, see `make_autocommit`. In
+    both cases, committing is skipped unless the session has pending changes.
     """
     try:
         session: SqlaSession = _session_factories[key]()
@@ -126,6 +684,13 @@ def open_session(key: str = _DEFAULT_SESSION_KEY) -> Generator[SqlaSession, None
         ) from exc
 
     logger.bind(db_session=session)
+    metrics.count_session_opened(key)
+    if statement_timeout.get_deadline(key) is not None:
+        statement_timeout.set_statement_timeout(session, key)
+    if read_only:
+        make_read_only(session, key)
+    if autocommit:
+        make_autocommit(session, key)
 
     try:
         yield session
@@ -135,6 +700,9 @@ def open_session(key: str = _DEFAULT_SESSION_KEY) -> Generator[SqlaSession, None
         raise
 
     else:
+        if is_clean(session):
+            return
+
         try:
             session.commit()
         except Exception:
@@ -146,11 +714,300 @@ def open_session(key: str = _DEFAULT_SESSION_KEY) -> Generator[SqlaSession, None
         session.close()
 
 
+class LazySession:
+    """Proxy to a sqla session only opened the first time it is accessed.
+
+    Attribute access is forwarded to the session returned by `open_session`, which is
+    entered on first access. Exiting the proxy context is a no-op when the session was
+    never opened, so requests which do not use the db don't pay for a session.
+    """
+
+    def __init__(
+        self, key: str = _DEFAULT_SESSION_KEY, read_only: bool = False
+    ) -> None:
+        self._key = key
+        self.read_only = read_only
+        self._session: SqlaSession | None = None
+        self._exit_stack = ExitStack()
+
+    @property
+    def is_opened(self) -> bool:
+        return self._session is not None
+
+    def open(self) -> SqlaSession:
+        if self._session is None:
+            self._session = self._exit_stack.enter_context(
+                open_session(self._key, read_only=self.read_only)
+            )
+        return self._session
+
+    def __getattr__(self, name: str):
+        return getattr(self.open(), name)
+
+    async def __aenter__(self) -> "LazySession":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> bool | None:
+        if not self.is_opened:
+            return None
+        return await run_in_executor(
+            self._key, self._exit_stack.__exit__, exc_type, exc_value, traceback
+        )
+
+
+def wrap_send(
+    sessions: list[tuple[Any, Any]], scope: Scope, receive: Receive, send: Send
+) -> Send:
+    """Wrap ASGI send to end the request sessions before the response starts.
+
+    `sessions` pairs session middlewares with the session each one opened.
+    """
+
+    async def send_wrapper(message: Message) -> None:
+        if message["type"] != "http.response.start":
+            return await send(message)
+
+        status_code = await end_sessions(sessions, message["status"])
+        if status_code != message["status"]:
+            response = PlainTextResponse(
+                content="Internal Server Error", status_code=status_code
+            )
+            return await response(scope, receive, send)
+
+        if status_code < 400:
+            headers = await get_consistency_headers(sessions)
+            if headers:
+                message = {**message, "headers": [*message["headers"], *headers]}
+
+        return await send(message)
+
+    return send_wrapper
+
+
+async def get_consistency_headers(
+    sessions: list[tuple[Any, Any]],
+) -> list[tuple[bytes, bytes]]:
+    """Return consistency token response headers of committed sessions."""
+    sessions = [(m, session) for m, session in sessions if m.consistency_header]
+    if not sessions:
+        return []
+
+    tokens = await asyncio.gather(
+        *(middleware.get_consistency_token(session) for middleware, session in sessions)
+    )
+    return [
+        (middleware.consistency_header.encode("latin-1"), token.encode("latin-1"))
+        for (middleware, _), token in zip(sessions, tokens, strict=True)
+        if token
+    ]
+
+
+@contextmanager
+def requiring_lsns(middlewares: list[Any], request: Request) -> Generator[None]:
+    """Require readers to have replayed the WAL positions sent in request headers.
+
+    Each middleware with a `consistency_header` reads the consistency token of its key
+    from that header.
+    """
+    lsns = {}
+    for middleware in middlewares:
+        if not middleware.consistency_header:
+            continue
+
+        token = request.headers.get(middleware.consistency_header)
+        if token and read_replicas.is_lsn(token):
+            lsns[middleware.key] = token
+
+    if not lsns:
+        yield
+        return
+
+    context_token = read_replicas.required_lsns.set(lsns)
+    try:
+        yield
+    finally:
+        read_replicas.required_lsns.reset(context_token)
+
+
+@asynccontextmanager
+async def admitting(middlewares: list[Any]) -> AsyncGenerator[Response | None, None]:
+    """Admit the request with the admission controllers of middlewares.
+
+    Yield None when the request is admitted, else the response rejecting it. Session
+    slots are acquired in the order of middlewares and released when exiting.
+    """
+    admitted = []
+    try:
+        for middleware in middlewares:
+            controller = middleware.admission
+            if controller is None:
+                continue
+
+            if not await controller.acquire():
+                _middleware_counters[middleware.key]["shed"] += 1
+                logger.warning(
+                    "sessions saturated, shedding request",
+                    engine_key=middleware.key,
+                    **controller.stats(),
+                )
+                yield controller.rejection()
+                return
+
+            admitted.append(controller)
+
+        yield None
+    finally:
+        for controller in admitted:
+            await controller.release()
+
+
+@contextmanager
+def within_deadlines(middlewares: list[Any], request: Request) -> Generator[None]:
+    """Bound the statements of the request sessions by the request deadline.
+
+    Each middleware reads the time left to the request, in milliseconds, from its
+    `deadline_header`, and defaults to its `statement_timeout`: the lowest applies.
+    """
+    now = time.monotonic()
+    request_deadlines = {}
+    for middleware in middlewares:
+        timeouts = [middleware.statement_timeout]
+        if middleware.deadline_header:
+            header = request.headers.get(middleware.deadline_header)
+            timeouts.append(statement_timeout.parse_timeout(header))
+
+        timeouts = [timeout for timeout in timeouts if timeout is not None]
+        if timeouts:
+            request_deadlines[middleware.key] = now + min(timeouts) / 1000
+
+    if not request_deadlines:
+        yield
+        return
+
+    context_token = statement_timeout.deadlines.set(request_deadlines)
+    try:
+        yield
+    finally:
+        statement_timeout.deadlines.reset(context_token)
+
+
+async def call_app(
+    app: ASGIApp,
+    sessions: list[tuple[Any, Any]],
+    scope: Scope,
+    receive: Receive,
+    send: Send,
+) -> None:
+    """Call app, cancelling the db statements of sessions if the client disconnects.
+
+    The request method and path are kept in `metrics.current_route` for logging.
+
+    Only sessions of middlewares with `cancel_on_disconnect` are cancelled. When any of
+    them is async, app is cancelled as well: asyncpg cancels the running statement when
+    its task is cancelled, while sync endpoints running in the threadpool are awaited
+    until their cancelled statement fails.
+
+    Sessions are rolled back when the client disconnects before the response starts,
+    see `disconnect.ClientDisconnectedError`.
+    """
+    route_token = metrics.current_route.set(f"{scope['method']} {scope['path']}")
+    try:
+        await _call_app(app, sessions, scope, receive, send)
+    finally:
+        metrics.current_route.reset(route_token)
+
+
+async def _call_app(
+    app: ASGIApp,
+    sessions: list[tuple[Any, Any]],
+    scope: Scope,
+    receive: Receive,
+    send: Send,
+) -> None:
+    to_cancel = [(m, session) for m, session in sessions if m.cancel_on_disconnect]
+    if not to_cancel:
+        return await app(scope, receive, send)
+
+    async def on_disconnect() -> None:
+        await asyncio.gather(
+            *(middleware.cancel(session) for middleware, session in to_cancel)
+        )
+
+    await disconnect.call_until_disconnect(
+        app,
+        scope,
+        receive,
+        send,
+        on_disconnect,
+        cancel_app=any(middleware.is_async for middleware, _ in to_cancel),
+    )
+
+
+async def end_sessions(sessions: list[tuple[Any, Any]], status_code: int) -> int:
+    """Commit or rollback sessions according to the response status code.
+
+    Sessions are committed concurrently, then all of them are rolled back if the
+    status code is an error one or if any commit failed: sessions which already
+    committed stay committed. Return the status code of the response to send: 500 if
+    any commit failed.
+    """
+    to_end = []
+    for middleware, session in sessions:
+        if middleware.is_clean(session):
+            # Finish the request on the event loop: nothing to commit
+            outcome = "commits" if status_code < 400 else "rollbacks"
+            _middleware_counters[middleware.key][f"{outcome}_skipped"] += 1
+        else:
+            is_dirty = has_changes(session)
+            to_end.append((middleware, session, is_dirty))
+
+    # try to commit after response, so that we can return a proper 500
+    # and not raise a true internal server error
+    if to_end and status_code < 400:
+        committed = await asyncio.gather(
+            *(middleware.commit(session) for middleware, session, _ in to_end)
+        )
+        if not all(committed):
+            status_code = 500
+
+    if to_end and status_code >= 400:
+        # If ever a route handler returns an http exception,
+        # we do not want the current session to commit anything in db.
+        await asyncio.gather(
+            *(
+                middleware.rollback(session, status_code, is_dirty)
+                for middleware, session, is_dirty in to_end
+            )
+        )
+
+    return status_code
+
+
 class SessionMiddleware:
     """Middleware which injects a new sqla session into every request.
 
     Handles creation of session, as well as commit, rollback, and closing of session.
 
+    When `lazy` is set, or `fastapi_sqla_lazy_session_enabled` environment variable is
+    `true`, the session is only opened when first accessed during the request.
+
+    When the key has readers and a `consistency_header` option, the writer WAL position
+    is returned in that header after committing writes. Requests sending it back only
+    read from a reader which replayed up to it.
+
+    When the key `read_only_safe_methods` option is `true`, `GET` and `HEAD` requests
+    get a read only session, see `open_session`.
+
+    When the key has a `deadline_header` or a `statement_timeout` option, the session
+    transactions are bounded by the time left to the request, see `within_deadlines`.
+
+    When the key `cancel_on_disconnect` option is `true`, the statements running when
+    the client disconnects are cancelled, see `call_app`.
+
+    When the key has a `max_sessions` option, requests past it wait for a session to
+    end or are rejected with a 503, see `AdmissionController`. Requests are admitted
+    when they enter the middleware: a lazy session holds its slot even if never opened.
+
     Usage::
 
         import fastapi_sqla
@@ -165,64 +1022,123 @@ class SessionMiddleware:
             return session.execute(...) # use your session here
     """
 
-    def __init__(self, app: ASGIApp, key: str = _DEFAULT_SESSION_KEY) -> None:
+    is_async = False
+
+    def __init__(
+        self, app: ASGIApp, key: str = _DEFAULT_SESSION_KEY, lazy: bool | None = None
+    ) -> None:
         self.app = app
         self.key = key
+        self.lazy = is_lazy_session_enabled() if lazy is None else lazy
+        self.state_key = f"{_REQUEST_SESSION_KEY}_{key}"
+        self.consistency_header = get_option(key, "consistency_header")
+        self.read_only = is_read_only_enabled(key)
+        self.deadline_header = get_option(key, "deadline_header")
+        self.statement_timeout = statement_timeout.parse_timeout(
+            get_option(key, "statement_timeout")
+        )
+        self.cancel_on_disconnect = is_cancel_on_disconnect_enabled(key)
+        self.admission = get_admission_controller(key)
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         if scope["type"] != "http":
             return await self.app(scope, receive, send)
 
-        async with contextmanager_in_threadpool(open_session(self.key)) as session:
-            request = Request(scope=scope, receive=receive, send=send)
-            setattr(request.state, f"{_REQUEST_SESSION_KEY}_{self.key}", session)
-
-            async def send_wrapper(message: Message) -> None:
-                if message["type"] != "http.response.start":
-                    return await send(message)
-
-                response: Response | None = None
-                status_code = message["status"]
-                is_dirty = bool(session.dirty or session.deleted or session.new)
-
-                loop = asyncio.get_running_loop()
-
-                # try to commit after response, so that we can return a proper 500
-                # and not raise a true internal server error
-                if status_code < 400:
-                    try:
-                        await loop.run_in_executor(None, session.commit)
-                    except Exception:
-                        logger.exception("commit failed, returning http error")
-                        status_code = 500
-                        response = PlainTextResponse(
-                            content="Internal Server Error", status_code=status_code
-                        )
-
-                if status_code >= 400:
-                    # If ever a route handler returns an http exception,
-                    # we do not want the current session to commit anything in db.
-                    if is_dirty:
-                        # optimistically only log if there were uncommitted changes
-                        logger.warning(
-                            "http error, rolling back possibly uncommitted changes",
-                            status_code=status_code,
-                        )
-                    # since this is no-op if the session is not dirty,
-                    # we can always call it
-                    await loop.run_in_executor(None, session.rollback)
-
-                if response:
-                    return await response(scope, receive, send)
-
-                return await send(message)
-
-            await self.app(scope, receive, send_wrapper)
+        request = Request(scope=scope, receive=receive, send=send)
+        read_only = self.is_read_only_request(request)
+        async with admitting([self]) as rejection:
+            if rejection:
+                return await rejection(scope, receive, send)
+
+            with (
+                suppress(disconnect.ClientDisconnectedError),
+                requiring_lsns([self], request),
+                within_deadlines([self], request),
+            ):
+                async with self.session_context(read_only) as session:
+                    setattr(request.state, self.state_key, session)
+
+                    sessions = [(self, session)]
+                    send_wrapper = wrap_send(sessions, scope, receive, send)
+                    await call_app(self.app, sessions, scope, receive, send_wrapper)
+
+    def is_read_only_request(self, request: Request) -> bool:
+        return self.read_only and request.method in _SAFE_METHODS
+
+    def session_context(self, read_only: bool = False) -> AbstractAsyncContextManager:
+        if self.lazy:
+            return LazySession(self.key, read_only=read_only)
+
+        return contextmanager_in_executor(
+            self.key, open_session(self.key, read_only=read_only)
+        )
+
+    def is_clean(self, session: SqlaSession | LazySession) -> bool:
+        if isinstance(session, LazySession) and not session.is_opened:
+            return True
+
+        return is_clean(session)  # type: ignore[arg-type]
+
+    async def commit(self, session: SqlaSession) -> bool:
+        """Commit session and return whether it succeeded."""
+        _middleware_counters[self.key]["commits"] += 1
+        try:
+            await run_in_executor(self.key, session.commit)
+        except Exception:
+            logger.exception("commit failed, returning http error")
+            return False
+
+        return True
+
+    async def rollback(
+        self, session: SqlaSession, status_code: int, is_dirty: bool
+    ) -> None:
+        if is_dirty:
+            # optimistically only log if there were uncommitted changes
+            logger.warning(
+                "http error, rolling back possibly uncommitted changes",
+                status_code=status_code,
+            )
+        # since this is no-op if the session is not dirty,
+        # we can always call it
+        _middleware_counters[self.key]["rollbacks"] += 1
+        await run_in_executor(self.key, session.rollback)
+
+    async def cancel(self, session: SqlaSession | LazySession) -> None:
+        """Cancel the statements session is running."""
+        if isinstance(session, LazySession) and not session.is_opened:
+            return
+
+        # Not in the key executor: it is likely busy running the statements to cancel
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, disconnect.cancel_statements, session)
+
+    async def get_consistency_token(self, session: SqlaSession) -> str | None:
+        """Return the writer WAL position when session wrote through it."""
+        if isinstance(session, LazySession) and not session.is_opened:
+            return None
+
+        if not read_replicas.uses_writer(session):
+            return None
+
+        if is_read_only(session):
+            return None
+
+        return await run_in_executor(self.key, read_replicas.get_current_lsn, session)
 
 
 class SessionDependency:
-    def __init__(self, key: str = _DEFAULT_SESSION_KEY) -> None:
+    def __init__(
+        self,
+        key: str = _DEFAULT_SESSION_KEY,
+        read_only: bool = False,
+        autocommit: bool = False,
+        bulkhead: str | None = None,
+    ) -> None:
         self.key = key
+        self.read_only = read_only
+        self.autocommit = autocommit
+        self.bulkhead = bulkhead
 
     def __call__(self, request: Request) -> SqlaSession:
         """Yield the sqlalchemy session for that request.
@@ -237,9 +1153,14 @@ class SessionDependency:
             @router.get("/users")
             def get_users(session: SqlaSession = Depends(SessionDependency())):
                 pass
+
+        With `read_only`, the session transactions are read only. With `autocommit`,
+        the session statements run without transaction. With `bulkhead`, the session
+        uses the connection pool of that bulkhead of the key, see `use_bulkhead`. They
+        only apply provided the session did not begin a transaction yet.
         """
         try:
-            return getattr(request.state, f"{_REQUEST_SESSION_KEY}_{self.key}")
+            session = getattr(request.state, f"{_REQUEST_SESSION_KEY}_{self.key}")
         except AttributeError:
             logger.exception(
                 f"No session with key '{self.key}' found in request, "
@@ -248,6 +1169,21 @@ class SessionDependency:
             )
             raise
 
+        if isinstance(session, LazySession):
+            if self.read_only and not session.is_opened:
+                session.read_only = True
+            session = session.open()
+
+        if self.bulkhead:
+            use_bulkhead(session, self.key, self.bulkhead)
+        if self.read_only:
+            make_read_only(session, self.key)
+        if self.autocommit:
+            make_autocommit(session, self.key)
+
+        return session
+
 
 default_session_dep = SessionDependency()
 Session = Annotated[SqlaSession, Depends(default_session_dep)]
+ReadOnlySession = Annotated[SqlaSession, Depends(SessionDependency(read_only=True))]
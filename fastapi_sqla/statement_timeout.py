@@ -0,0 +1,85 @@
+import math
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event, text
+
+from fastapi_sqla import read_replicas
+
+# Monotonic time by which the db work of current request must be done, by engine key
+deadlines: ContextVar[dict[str, float] | None] = ContextVar("deadlines", default=None)
+
+# Largest statement_timeout postgres accepts, in milliseconds
+MAX_TIMEOUT_MS = 2**31 - 1
+
+
+def parse_timeout(value: str | None) -> float | None:
+    """Return a timeout in milliseconds as a float, None when it is not valid.
+
+    Timeouts must be positive and finite. They are capped to `MAX_TIMEOUT_MS`.
+    """
+    if not value:
+        return None
+
+    try:
+        timeout = float(value)
+    except ValueError:
+        return None
+
+    if not math.isfinite(timeout) or timeout <= 0:
+        return None
+
+    return min(timeout, MAX_TIMEOUT_MS)
+
+
+def get_deadline(key: str) -> float | None:
+    return (deadlines.get() or {}).get(key)
+
+
+def set_statement_timeout(session, key: str) -> None:
+    """Bound the statements of session transactions by the deadline of key.
+
+    Each transaction session begins runs `SET LOCAL statement_timeout` with the time
+    left before the deadline. On autocommit connections, which have no transaction,
+    `SET statement_timeout` applies to the connection until it returns to its pool.
+    """
+    session.info["deadline_key"] = key
+    event.listen(session, "after_begin", _set_local_statement_timeout)
+
+
+def _set_local_statement_timeout(session, transaction, connection) -> None:
+    deadline = get_deadline(session.info["deadline_key"])
+    if deadline is None:
+        return
+
+    # statement_timeout 0 disables the timeout: the deadline passed, fail fast instead
+    timeout_ms = max(int((deadline - time.monotonic()) * 1000), 1)
+    timeout_ms = min(timeout_ms, MAX_TIMEOUT_MS)
+    if not read_replicas.is_autocommit_connection(connection):
+        connection.execute(text(f"SET LOCAL statement_timeout = {timeout_ms}"))
+        return
+
+    pool = connection.engine.pool
+    if not event.contains(pool, "reset", _reset_statement_timeout):
+        event.listen(pool, "reset", _reset_statement_timeout)
+
+    connection.execute(text(f"SET statement_timeout = {timeout_ms}"))
+    connection.info["statement_timeout_set"] = True
+
+
+def _reset_statement_timeout(
+    dbapi_connection, connection_record, reset_state=None
+) -> None:
+    if not connection_record.info.pop("statement_timeout_set", False):
+        return
+
+    # sqlalchemy < 2.0 does not pass reset_state
+    if reset_state and (reset_state.terminate_only or not reset_state.asyncio_safe):
+        return
+
+    # still in autocommit mode: the connection isolation level is reset afterwards
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("RESET statement_timeout")
+    finally:
+        cursor.close()
@@ -69,6 +69,10 @@ def app(User, monkeypatch, db_url):
     def create_user(user: UserIn, session: Session):
         session.add(User(**dict(user)))
 
+    @app.get("/health")
+    def health():
+        return "OK"
+
     @app.get("/404")
     def get_users(
         session: SqlaSession = Depends(SessionDependency(key=custom_session_key)),
@@ -84,6 +88,11 @@ def app(User, monkeypatch, db_url):
     return app
 
 
+@fixture
+def lazy_session_enabled(monkeypatch):
+    monkeypatch.setenv("fastapi_sqla_lazy_session_enabled", "true")
+
+
 @fixture
 def mock_middleware(app: FastAPI):
     mock_middleware = Mock()
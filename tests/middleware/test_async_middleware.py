@@ -40,6 +40,10 @@ def app(User, monkeypatch, async_sqlalchemy_url, async_session_key):
     def create_user(user: UserIn, session: AsyncSession):
         session.add(User(**dict(user)))
 
+    @app.get("/health")
+    async def health():
+        return "OK"
+
     @app.get("/404")
     def get_users(
         session: SqlaAsyncSession = Depends(
@@ -148,3 +152,36 @@ async def test_async_session_dependency_raises_unknown_key(client):
         "exc_info": True,
         "session_key": "unknown",
     } in caplog
+
+
+async def test_lazy_session_not_opened_when_unused(lazy_session_enabled, client):
+    with patch("fastapi_sqla.async_sqla.open_session") as open_session:
+        res = await client.get("/health")
+
+    assert res.status_code == 200
+    open_session.assert_not_called()
+
+
+async def test_lazy_async_session_dependency(
+    lazy_session_enabled, client, faker, async_session
+):
+    userid = faker.unique.random_int()
+    res = await client.post(
+        "/users", json={"id": userid, "first_name": "Bob", "last_name": "Morane"}
+    )
+    assert res.status_code == 200, res.json()
+    row = (
+        await async_session.execute(
+            text(f"select * from public.user where id = {userid}")
+        )
+    ).fetchone()
+    assert row == (userid, "Bob", "Morane")
+
+
+async def test_clean_session_skips_commit(client):
+    from fastapi_sqla.sqla import _DEFAULT_SESSION_KEY, get_middleware_stats
+
+    res = await client.get("/health")
+
+    assert res.status_code == 200
+    assert get_middleware_stats(_DEFAULT_SESSION_KEY)["commits_skipped"] == 1
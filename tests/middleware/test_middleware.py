@@ -92,3 +92,51 @@ async def test_session_dependency_raises_unknown_key(client):
         "exc_info": True,
         "session_key": "unknown",
     } in caplog
+
+
+async def test_lazy_session_not_opened_when_unused(lazy_session_enabled, client):
+    with patch("fastapi_sqla.sqla.open_session") as open_session:
+        res = await client.get("/health")
+
+    assert res.status_code == 200
+    open_session.assert_not_called()
+
+
+async def test_lazy_session_dependency(lazy_session_enabled, client, faker, session):
+    userid = faker.unique.random_int()
+    res = await client.post(
+        "/users", json={"id": userid, "first_name": "Bob", "last_name": "Morane"}
+    )
+    assert res.status_code == 200, res.json()
+    row = session.execute(
+        text(f"select * from public.user where id = {userid}")
+    ).fetchone()
+    assert row == (userid, "Bob", "Morane")
+
+
+async def test_clean_session_skips_commit(client):
+    from fastapi_sqla.sqla import get_middleware_stats
+
+    res = await client.get("/health")
+
+    assert res.status_code == 200
+    assert get_middleware_stats() == {
+        "commits": 0,
+        "commits_skipped": 1,
+        "rollbacks": 0,
+        "rollbacks_skipped": 0,
+        "shed": 0,
+    }
+
+
+async def test_dirty_session_commits(client, faker):
+    from fastapi_sqla.sqla import get_middleware_stats
+
+    res = await client.post(
+        "/users",
+        json={"id": faker.unique.random_int(), "first_name": "B", "last_name": "M"},
+    )
+
+    assert res.status_code == 200
+    assert get_middleware_stats()["commits"] == 1
+    assert get_middleware_stats()["commits_skipped"] == 0
@@ -121,6 +121,7 @@ class UserWithMeta(User):
 @fixture
 def app(user_cls, note_cls, monkeypatch, db_url):
     from fastapi_sqla import (
+        HasNextPage,
         Page,
         Paginate,
         PaginateSignature,
@@ -203,6 +204,12 @@ def app(user_cls, note_cls, monkeypatch, db_url):
         )
         return paginate(query)
 
+    NegotiatedPaginate = Pagination(negotiate_count=True)
+
+    @app.get("/v2/users-negotiated", response_model=Page[User] | HasNextPage[User])
+    def list_users_with_negotiated_count(paginate: NegotiatedPaginate = Depends()):
+        return paginate(select(user_cls).order_by(user_cls.id))
+
     return app
 
 
@@ -89,3 +89,16 @@ async def test_async_pagination(client, offset, items_number, path, nb_notes):
 
     meta = result.json()["meta"]
     assert meta["total_items"] == nb_notes
+
+
+@mark.sqlalchemy("1.4")
+@mark.require_asyncpg
+async def test_async_pagination_without_count(async_session, note_cls, nb_notes):
+    from fastapi_sqla import AsyncPagination
+
+    query = select(note_cls).order_by(note_cls.id)
+    paginate = AsyncPagination(count=False)(async_session, nb_notes - 10, 10, False)
+    result = await paginate(query)
+
+    assert len(result.data) == 10
+    assert result.meta.has_next is False
@@ -0,0 +1,148 @@
+import base64
+import json
+
+from fastapi import HTTPException
+from pytest import mark, raises
+from sqlalchemy import select
+
+pytestmark = mark.sqlalchemy("1.4")
+
+
+def walk(paginate, cursor=None, direction="next_cursor"):
+    pages = []
+    while True:
+        page = paginate(cursor)
+        pages.append(page)
+        cursor = getattr(page.meta, direction)
+        if cursor is None:
+            return pages
+
+
+def test_keyset_pagination_walks_all_pages(session, user_cls, nb_users):
+    from fastapi_sqla import KeysetPagination
+
+    query, order_by = select(user_cls), [user_cls.id]
+    pages = walk(
+        lambda cursor: KeysetPagination()(session, cursor, 10)(query, order_by)
+    )
+
+    assert [len(page.data) for page in pages] == [10, 10, 10, 10, 2]
+    assert [user.id for page in pages for user in page.data] == list(
+        range(1, nb_users + 1)
+    )
+    assert pages[0].meta.prev_cursor is None
+
+
+def test_keyset_pagination_walks_back_with_prev_cursor(session, user_cls):
+    from fastapi_sqla import KeysetPagination
+
+    query, order_by = select(user_cls), [user_cls.id]
+    last_page = walk(
+        lambda cursor: KeysetPagination()(session, cursor, 10)(query, order_by)
+    )[-1]
+    pages = walk(
+        lambda cursor: KeysetPagination()(session, cursor, 10)(query, order_by),
+        cursor=last_page.meta.prev_cursor,
+        direction="prev_cursor",
+    )
+
+    assert [page.data[0].id for page in pages] == [31, 21, 11, 1]
+    assert all(len(page.data) == 10 for page in pages)
+    assert all(page.meta.next_cursor for page in pages)
+
+
+def test_keyset_pagination_with_mixed_ordering(session, note_cls, nb_notes):
+    from fastapi_sqla import KeysetPagination
+
+    query = select(note_cls.user_id, note_cls.id)
+    order_by = [note_cls.user_id.desc(), note_cls.id]
+    pages = walk(
+        lambda cursor: KeysetPagination()(session, cursor, 100)(
+            query, order_by, scalars=False
+        )
+    )
+
+    rows = [(row["user_id"], row["id"]) for page in pages for row in page.data]
+    assert len(rows) == nb_notes
+    assert rows == sorted(rows, key=lambda row: (-row[0], row[1]))
+    assert set(pages[0].data[0]) == {"user_id", "id"}
+
+
+def encode(payload):
+    content = json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(content).decode().rstrip("=")
+
+
+@mark.parametrize(
+    "cursor",
+    [
+        "invalid",
+        encode(["not", "an", "object"]),
+        encode({"values": ["1"]}),
+        encode({"values": [True]}),
+        encode({"values": [1.5]}),
+        encode({"values": [1, 2]}),
+    ],
+)
+def test_keyset_pagination_rejects_invalid_cursor(session, user_cls, cursor):
+    from fastapi_sqla import KeysetPagination
+
+    with raises(HTTPException) as exc_info:
+        KeysetPagination()(session, cursor, 10)(select(user_cls), [user_cls.id])
+
+    assert exc_info.value.status_code == 400
+
+
+def test_decode_cursor_validates_values_against_column_types():
+    from sqlalchemy import Column, DateTime, Float, Numeric, String
+
+    from fastapi_sqla.pagination import decode_cursor
+
+    keyset = [
+        (Column("created_at", DateTime()), False),
+        (Column("amount", Numeric()), False),
+        (Column("rate", Float()), False),
+        (Column("name", String()), False),
+    ]
+
+    values, _ = decode_cursor(
+        encode({"values": ["2024-01-02T03:04:05", "1.5", 2, "bob"]}), keyset
+    )
+    assert [str(value) for value in values] == [
+        "2024-01-02 03:04:05",
+        "1.5",
+        "2.0",
+        "bob",
+    ]
+
+    for invalid in (
+        [20240102, "1.5", 2, "bob"],
+        ["2024-01-02T03:04:05", "abc", 2, "bob"],
+        ["2024-01-02T03:04:05", "1.5", "2", "bob"],
+        ["2024-01-02T03:04:05", "1.5", 2, 3],
+    ):
+        with raises(HTTPException):
+            decode_cursor(encode({"values": invalid}), keyset)
+
+
+def test_keyset_pagination_requires_ordering(session, user_cls):
+    from fastapi_sqla import KeysetPagination
+
+    with raises(ValueError, match="requires ordering expressions"):
+        KeysetPagination()(session, None, 10)(select(user_cls), [])
+
+
+@mark.require_asyncpg
+async def test_async_keyset_pagination(async_session, user_cls, nb_users):
+    from fastapi_sqla import AsyncKeysetPagination
+
+    query, order_by = select(user_cls), [user_cls.id.desc()]
+    ids, cursor = [], None
+    while True:
+        page = await AsyncKeysetPagination()(async_session, cursor, 10)(query, order_by)
+        ids += [user.id for user in page.data]
+        cursor = page.meta.next_cursor
+        if cursor is None:
+            break
+
+    assert ids == list(range(nb_users, 0, -1))
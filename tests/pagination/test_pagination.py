@@ -1,4 +1,7 @@
+from unittest.mock import patch
+
 from pytest import mark, param
+from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 
 
@@ -74,3 +77,113 @@ async def test_json_result(client):
     result = await client.get("/v2/query-with-json-result")
 
     assert result.status_code == 200, result.json()
+
+
+@mark.sqlalchemy("1.4")
+@mark.parametrize("offset,items_number", [(0, 10), (40, 2), (50, 0)])
+def test_pagination_with_window_count(
+    session, user_cls, offset, items_number, nb_users
+):
+    from fastapi_sqla import Pagination
+
+    query = select(user_cls).options(joinedload(user_cls.notes)).order_by(user_cls.id)
+    result = Pagination(window_count=True)(session, offset, 10)(query)
+
+    assert [user.id for user in result.data] == list(
+        range(offset + 1, offset + 1 + items_number)
+    )
+    assert result.meta.total_items == nb_users
+    assert result.meta.total_pages == 5
+
+
+@mark.sqlalchemy("1.4")
+def test_pagination_with_window_count_of_non_scalar_results(session, user_cls):
+    from fastapi_sqla import Pagination
+
+    query = select(user_cls.id, user_cls.name).order_by(user_cls.id)
+    result = Pagination(window_count=True)(session, 0, 10)(query, scalars=False)
+
+    assert set(result.data[0]) == {"id", "name"}
+
+
+@mark.parametrize("offset,items_number,has_next", [(0, 10, True), (40, 2, False)])
+def test_pagination_without_count(session, user_cls, offset, items_number, has_next):
+    from fastapi_sqla import Pagination
+
+    query = session.query(user_cls).order_by(user_cls.id)
+    with patch("fastapi_sqla.pagination.default_query_count") as query_count:
+        result = Pagination(count=False)(session, offset, 10, False)(query)
+
+    query_count.assert_not_called()
+    assert [user.id for user in result.data] == list(
+        range(offset + 1, offset + 1 + items_number)
+    )
+    assert result.meta.has_next is has_next
+    assert result.meta.page_number == offset // 10 + 1
+
+
+@mark.parametrize(
+    "prefer,expected",
+    [
+        (None, False),
+        ("count=none", True),
+        ("return=minimal, COUNT=none", True),
+        ("count=exact", False),
+    ],
+)
+def test_prefers_no_count(prefer, expected):
+    from fastapi_sqla.pagination import prefers_no_count
+
+    assert prefers_no_count(prefer) is expected
+
+
+@mark.sqlalchemy("1.4")
+@mark.parametrize(
+    "params,headers,preference_applied",
+    [
+        ({"count": "false"}, {}, None),
+        ({}, {"Prefer": "count=none"}, "count=none"),
+    ],
+)
+async def test_negotiated_pagination_without_count(
+    client, params, headers, preference_applied
+):
+    result = await client.get(
+        "/v2/users-negotiated", params={"offset": 40, **params}, headers=headers
+    )
+
+    assert result.status_code == 200, result.json()
+    assert len(result.json()["data"]) == 2
+    assert result.json()["meta"] == {"offset": 40, "page_number": 5, "has_next": False}
+    assert result.headers.get("preference-applied") == preference_applied
+
+
+@mark.parametrize(
+    "vary,expected",
+    [
+        (None, "Prefer"),
+        ("Accept-Encoding", "Accept-Encoding, Prefer"),
+        ("accept-encoding, prefer", "accept-encoding, prefer"),
+        ("*", "*"),
+    ],
+)
+def test_count_preference_merges_vary(vary, expected):
+    from fastapi import Response
+
+    from fastapi_sqla.pagination import count_preference
+
+    response = Response()
+    if vary:
+        response.headers["Vary"] = vary
+
+    assert count_preference(response, count=True, prefer=None)
+    assert response.headers["Vary"] == expected
+
+
+@mark.sqlalchemy("1.4")
+async def test_negotiated_pagination_counts_by_default(client, nb_users):
+    result = await client.get("/v2/users-negotiated")
+
+    assert result.status_code == 200, result.json()
+    assert result.json()["meta"]["total_items"] == nb_users
+    assert "preference-applied" not in result.headers
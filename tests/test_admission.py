@@ -0,0 +1,139 @@
+import asyncio
+
+import httpx
+from asgi_lifespan import LifespanManager
+from fastapi import FastAPI
+from pytest import fixture
+
+
+async def test_requests_past_max_queued_are_rejected():
+    from fastapi_sqla.admission import AdmissionController
+
+    controller = AdmissionController(max_sessions=1, max_queued=0)
+
+    assert await controller.acquire()
+    assert not await controller.acquire()
+
+    await controller.release()
+    assert await controller.acquire()
+
+
+async def test_requests_waiting_past_max_wait_are_rejected():
+    from fastapi_sqla.admission import AdmissionController
+
+    controller = AdmissionController(max_sessions=1, max_wait_ms=10)
+
+    assert await controller.acquire()
+    assert not await controller.acquire()
+    assert controller.stats() == {
+        "max_sessions": 1,
+        "limit": 1,
+        "in_flight": 1,
+        "queued": 0,
+    }
+
+
+async def test_waiting_request_is_admitted_when_a_session_ends():
+    from fastapi_sqla.admission import AdmissionController
+
+    controller = AdmissionController(max_sessions=1, max_queued=1)
+    await controller.acquire()
+
+    waiting = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+    assert controller.stats()["queued"] == 1
+
+    await controller.release()
+    assert await waiting
+
+
+async def test_autotuner_decreases_limit_when_checkouts_wait():
+    from fastapi_sqla.admission import AdmissionController, Autotuner
+
+    checkout_wait = [0.0, 0]
+    autotuner = Autotuner(
+        "default",
+        lambda: tuple(checkout_wait),
+        min_sessions=2,
+        target_wait_ms=10,
+        interval_s=0,
+    )
+    controller = AdmissionController(max_sessions=8, autotuner=autotuner)
+
+    checkout_wait[:] = [500.0, 10]
+    assert await controller.acquire()
+    assert controller.limit == 6
+
+    checkout_wait[:] = [5500.0, 20]
+    assert await controller.acquire()
+    assert controller.limit == 5
+    assert autotuner.adjustments == {"decrease": 2}
+
+
+async def test_autotuner_increases_limit_when_saturated_without_wait():
+    from fastapi_sqla.admission import AdmissionController, Autotuner
+
+    autotuner = Autotuner(
+        "default", lambda: (0.0, 0), min_sessions=1, target_wait_ms=10, interval_s=0
+    )
+    controller = AdmissionController(max_sessions=2, autotuner=autotuner)
+    controller.limit = 1
+
+    assert await controller.acquire()
+    assert controller.limit == 1
+    assert await controller.acquire()
+    assert controller.limit == 2
+    assert autotuner.adjustments == {"increase": 1}
+
+
+@fixture
+def lazy_session_enabled(monkeypatch):
+    monkeypatch.setenv("fastapi_sqla_lazy_session_enabled", "true")
+
+
+@fixture
+async def client(monkeypatch):
+    from contextlib import asynccontextmanager
+
+    from fastapi_sqla import setup_middlewares, startup
+
+    monkeypatch.setenv("fastapi_sqla_max_sessions", "1")
+    monkeypatch.setenv("fastapi_sqla_max_queued_sessions", "0")
+    monkeypatch.setenv("fastapi_sqla_retry_after", "2")
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await startup()
+        yield
+
+    app = FastAPI(lifespan=lifespan)
+    setup_middlewares(app)
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(0.2)
+
+    async with (
+        LifespanManager(app),
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://example.local"
+        ) as client,
+    ):
+        yield client
+
+
+async def test_saturated_key_sheds_requests(client):
+    from fastapi_sqla.sqla import get_middleware_stats
+
+    responses = await asyncio.gather(client.get("/slow"), client.get("/slow"))
+
+    assert sorted(res.status_code for res in responses) == [200, 503]
+    rejected = next(res for res in responses if res.status_code == 503)
+    assert rejected.headers["retry-after"] == "2"
+    assert get_middleware_stats()["shed"] == 1
+
+
+async def test_lazy_sessions_never_opened_hold_their_slot(lazy_session_enabled, client):
+    responses = await asyncio.gather(client.get("/slow"), client.get("/slow"))
+
+    assert sorted(res.status_code for res in responses) == [200, 503]
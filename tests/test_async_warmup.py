@@ -0,0 +1,50 @@
+from pytest import mark
+from sqlalchemy import text
+
+pytestmark = [mark.require_asyncpg, mark.sqlalchemy("1.4")]
+
+
+def test_statement_cache_sizes(monkeypatch, async_session_key):
+    from fastapi_sqla.async_sqla import new_async_engine
+
+    monkeypatch.setenv(
+        f"fastapi_sqla__{async_session_key}__prepared_statement_cache_size", "500"
+    )
+    monkeypatch.setenv(f"fastapi_sqla__{async_session_key}__statement_cache_size", "0")
+
+    engine = new_async_engine(async_session_key)
+
+    assert engine.url.query["prepared_statement_cache_size"] == "500"
+
+
+def test_statement_cache_size_is_merged_in_connect_args(monkeypatch):
+    from fastapi_sqla.async_sqla import _with_statement_cache_sizes
+
+    monkeypatch.setenv("fastapi_sqla_statement_cache_size", "0")
+    config = {
+        "sqlalchemy_url": "postgresql+asyncpg://postgres@localhost/postgres",
+        "sqlalchemy_connect_args": {"server_settings": {"jit": "off"}},
+    }
+
+    config = _with_statement_cache_sizes("default", config)
+
+    assert config["sqlalchemy_connect_args"] == {
+        "server_settings": {"jit": "off"},
+        "statement_cache_size": 0,
+    }
+
+
+async def test_warmup_statements_run_on_new_connections(async_session_key):
+    from fastapi_sqla.async_sqla import (
+        _async_session_factories,
+        add_warmup_statement,
+        startup,
+    )
+
+    add_warmup_statement("SET application_name = 'warm'", key=async_session_key)
+    await startup(async_session_key)
+
+    engine = _async_session_factories[async_session_key].kw["bind"]
+    async with engine.connect() as connection:
+        result = await connection.execute(text("SHOW application_name"))
+        assert result.scalar() == "warm"
@@ -2,11 +2,9 @@ from unittest.mock import Mock, patch
 
 from pytest import mark
 
-from fastapi_sqla import async_sqla, sqla
-
 
 def test_setup_middlewares_multiple_engines(db_url):
-    from fastapi_sqla.base import setup_middlewares
+    from fastapi_sqla.base import SqlaMiddleware, setup_middlewares
     from fastapi_sqla.sqla import _DEFAULT_SESSION_KEY
 
     read_only_key = "read_only"
@@ -22,36 +20,31 @@ def test_setup_middlewares_multiple_engines(db_url):
     ):
         setup_middlewares(app)
 
-    assert app.add_middleware.call_count == 2
-    assert all(
-        call.args[0] == sqla.SessionMiddleware
-        for call in app.add_middleware.call_args_list
+    app.add_middleware.assert_called_once_with(
+        SqlaMiddleware,
+        sync_keys=sorted([_DEFAULT_SESSION_KEY, read_only_key]),
+        async_keys=[],
     )
 
-    app.add_middleware.assert_any_call(sqla.SessionMiddleware, key=_DEFAULT_SESSION_KEY)
-    app.add_middleware.assert_any_call(sqla.SessionMiddleware, key=read_only_key)
-
 
 @mark.sqlalchemy("1.4")
 @mark.require_asyncpg
 def test_setup_middlewares_with_sync_and_async_sqlalchemy_url(async_session_key):
-    from fastapi_sqla.base import setup_middlewares
+    from fastapi_sqla.base import SqlaMiddleware, setup_middlewares
     from fastapi_sqla.sqla import _DEFAULT_SESSION_KEY
 
     app = Mock()
     setup_middlewares(app)
 
-    assert app.add_middleware.call_count == 2
-    app.add_middleware.assert_any_call(sqla.SessionMiddleware, key=_DEFAULT_SESSION_KEY)
-    app.add_middleware.assert_any_call(
-        async_sqla.AsyncSessionMiddleware, key=async_session_key
+    app.add_middleware.assert_called_once_with(
+        SqlaMiddleware, sync_keys=[_DEFAULT_SESSION_KEY], async_keys=[async_session_key]
     )
 
 
 @mark.sqlalchemy("1.4")
 @mark.require_asyncpg
 def test_setup_middlewares_with_async_default_sqlalchemy_url(async_sqlalchemy_url):
-    from fastapi_sqla.base import setup_middlewares
+    from fastapi_sqla.base import SqlaMiddleware, setup_middlewares
     from fastapi_sqla.sqla import _DEFAULT_SESSION_KEY
 
     app = Mock()
@@ -61,5 +54,14 @@ def test_setup_middlewares_with_async_default_sqlalchemy_url(async_sqlalchemy_ur
         setup_middlewares(app)
 
     app.add_middleware.assert_called_once_with(
-        async_sqla.AsyncSessionMiddleware, key=_DEFAULT_SESSION_KEY
+        SqlaMiddleware, sync_keys=[], async_keys=[_DEFAULT_SESSION_KEY]
     )
+
+
+def test_setup_middlewares_does_not_create_engines():
+    from fastapi_sqla.base import setup_middlewares
+
+    with patch("fastapi_sqla.sqla.new_engine") as new_engine:
+        setup_middlewares(Mock())
+
+    new_engine.assert_not_called()
@@ -78,3 +78,28 @@ async def test_startup_with_async_default_sqlalchemy_url(
     assert sqla_startup_mock.call_count == 0
     assert async_sqla_startup_mock.call_count == 1
     async_sqla_startup_mock.assert_called_once_with(key=_DEFAULT_SESSION_KEY)
+
+
+async def test_startup_logs_duration_of_each_key(
+    db_url, sqla_startup_mock, async_sqla_startup_mock
+):
+    from structlog.testing import capture_logs
+
+    from fastapi_sqla.base import startup
+
+    with (
+        patch.dict(
+            "os.environ",
+            values={
+                "sqlalchemy_url": db_url,
+                "fastapi_sqla__read_only__sqlalchemy_url": db_url,
+            },
+            clear=True,
+        ),
+        capture_logs() as caplog,
+    ):
+        await startup()
+
+    logs = [log for log in caplog if log["event"] == "engine key started"]
+    assert sorted(log["engine_key"] for log in logs) == ["default", "read_only"]
+    assert all(log["duration_ms"] >= 0 for log in logs)
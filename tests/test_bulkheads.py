@@ -0,0 +1,82 @@
+import httpx
+from asgi_lifespan import LifespanManager
+from fastapi import Depends, FastAPI
+from pytest import fixture, raises
+from sqlalchemy import text
+
+
+@fixture
+def bulkheads(monkeypatch):
+    monkeypatch.setenv("fastapi_sqla_bulkheads", "reporting=2, batch=1")
+
+
+def test_get_bulkhead_configs(bulkheads, db_url):
+    from fastapi_sqla.sqla import get_bulkhead_configs
+
+    configs = get_bulkhead_configs()
+
+    assert sorted(configs) == ["batch", "reporting"]
+    assert configs["reporting"]["sqlalchemy_url"] == db_url
+    assert configs["reporting"]["sqlalchemy_pool_size"] == "2"
+    assert configs["reporting"]["sqlalchemy_max_overflow"] == "0"
+
+
+def test_get_bulkhead_configs_fails_on_invalid_option(monkeypatch):
+    from fastapi_sqla.sqla import get_bulkhead_configs
+
+    monkeypatch.setenv("fastapi_sqla_bulkheads", "reporting")
+
+    with raises(ValueError, match="Invalid bulkhead 'reporting'"):
+        get_bulkhead_configs()
+
+
+def test_use_unknown_bulkhead_fails(bulkheads):
+    from fastapi_sqla.sqla import open_session, startup, use_bulkhead
+
+    startup()
+
+    with raises(KeyError, match="No bulkhead 'unknown'"), open_session() as session:
+        use_bulkhead(session, "default", "unknown")
+
+
+@fixture
+async def client(bulkheads):
+    from contextlib import asynccontextmanager
+
+    from fastapi_sqla import SessionDependency, SqlaSession, setup_middlewares, startup
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await startup()
+        yield
+
+    app = FastAPI(lifespan=lifespan)
+    setup_middlewares(app)
+
+    @app.get("/report")
+    def report(
+        session: SqlaSession = Depends(SessionDependency(bulkhead="reporting")),
+    ):
+        from fastapi_sqla.sqla import _bulkhead_engines
+
+        session.execute(text("select 1"))
+        engine = _bulkhead_engines["default"]["reporting"]
+        return {
+            "bulkhead": session.get_bind() is engine,
+            "checkedout": engine.pool.checkedout(),
+        }
+
+    async with (
+        LifespanManager(app),
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://example.local"
+        ) as client,
+    ):
+        yield client
+
+
+async def test_route_uses_bulkhead_pool(client):
+    res = await client.get("/report")
+
+    assert res.status_code == 200
+    assert res.json() == {"bulkhead": True, "checkedout": 1}
@@ -0,0 +1,172 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+from pytest import fixture, raises
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+
+def make_receive(*messages):
+    queue = asyncio.Queue()
+    for message in messages:
+        queue.put_nowait(message)
+
+    return queue.get, queue
+
+
+async def send(message):
+    pass
+
+
+async def test_on_disconnect_is_awaited_when_client_leaves_early():
+    from fastapi_sqla.disconnect import call_until_disconnect
+
+    receive, _ = make_receive(
+        {"type": "http.request", "body": b"", "more_body": False},
+        {"type": "http.disconnect"},
+    )
+    disconnected = asyncio.Event()
+
+    async def on_disconnect():
+        disconnected.set()
+
+    async def app(scope, receive, send):
+        assert (await receive())["type"] == "http.request"
+        await disconnected.wait()
+        assert (await receive())["type"] == "http.disconnect"
+
+    await asyncio.wait_for(
+        call_until_disconnect(app, {}, receive, send, on_disconnect), timeout=1
+    )
+
+
+async def test_app_is_cancelled_when_client_leaves_early():
+    from fastapi_sqla.disconnect import ClientDisconnectedError, call_until_disconnect
+
+    receive, _ = make_receive({"type": "http.disconnect"})
+    cancelled = False
+
+    async def app(scope, receive, send):
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    with raises(ClientDisconnectedError):
+        await asyncio.wait_for(
+            call_until_disconnect(app, {}, receive, send, AsyncMock(), cancel_app=True),
+            timeout=1,
+        )
+
+    assert cancelled
+
+
+async def test_response_cannot_start_after_client_left():
+    from fastapi_sqla.disconnect import ClientDisconnectedError, call_until_disconnect
+
+    receive, _ = make_receive({"type": "http.disconnect"})
+    on_disconnect = AsyncMock()
+
+    async def app(scope, receive, send):
+        assert (await receive())["type"] == "http.disconnect"
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    with raises(ClientDisconnectedError):
+        await call_until_disconnect(app, {}, receive, send, on_disconnect)
+
+    on_disconnect.assert_awaited_once()
+
+
+async def test_on_disconnect_is_not_awaited_after_response():
+    from fastapi_sqla.disconnect import call_until_disconnect
+
+    receive, queue = make_receive()
+    on_disconnect = AsyncMock()
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+        queue.put_nowait({"type": "http.disconnect"})
+        await asyncio.sleep(0.01)
+
+    await call_until_disconnect(app, {}, receive, send, on_disconnect)
+
+    on_disconnect.assert_not_awaited()
+
+
+@fixture
+def session(monkeypatch):
+    from fastapi_sqla.sqla import _DEFAULT_SESSION_KEY, _session_factories, startup
+
+    monkeypatch.setenv("fastapi_sqla_cancel_on_disconnect", "true")
+    startup()
+
+    session = _session_factories[_DEFAULT_SESSION_KEY]()
+    yield session
+    session.close()
+
+
+async def test_cancel_statements_cancels_running_statement(session):
+    from fastapi_sqla.disconnect import cancel_statements
+
+    session.execute(text("select 1"))
+    running = asyncio.to_thread(session.execute, text("select pg_sleep(10)"))
+    task = asyncio.create_task(running)
+    await asyncio.sleep(0.2)
+
+    cancel_statements(session)
+
+    with raises(DBAPIError, match="canceling statement"):
+        await asyncio.wait_for(task, timeout=5)
+
+
+@fixture
+def user_table(sqla_connection):
+    with sqla_connection.begin():
+        sqla_connection.execute(
+            text("create table if not exists disconnect_user (id integer primary key)")
+        )
+    yield
+    with sqla_connection.begin():
+        sqla_connection.execute(text("drop table disconnect_user"))
+
+
+async def test_session_is_rolled_back_when_client_leaves_early(
+    monkeypatch, user_table, sqla_connection, faker
+):
+    from starlette.requests import Request
+
+    from fastapi_sqla.sqla import SessionMiddleware, startup
+
+    monkeypatch.setenv("fastapi_sqla_cancel_on_disconnect", "true")
+    startup()
+    userid = faker.unique.random_int()
+    receive, queue = make_receive(
+        {"type": "http.request", "body": b"", "more_body": False}
+    )
+    sent = []
+
+    async def app(scope, receive, send):
+        session = getattr(Request(scope).state, middleware.state_key)
+        session.execute(text(f"insert into disconnect_user values ({userid})"))
+        queue.put_nowait({"type": "http.disconnect"})
+        assert (await receive())["type"] == "http.request"
+        assert (await receive())["type"] == "http.disconnect"
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = SessionMiddleware(app)
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": []}
+    await asyncio.wait_for(middleware(scope, receive, send), timeout=5)
+
+    assert sent == []
+    with sqla_connection.begin():
+        row = sqla_connection.execute(
+            text(f"select * from disconnect_user where id = {userid}")
+        ).fetchone()
+    assert row is None
@@ -5,7 +5,11 @@ def test_import_sync_api():
     from fastapi_sqla import (  # noqa
         Base,
         Collection,
+        CursorPage,
+        HasNextPage,
         Item,
+        KeysetPaginate,
+        KeysetPagination,
         Page,
         Paginate,
         Pagination,
@@ -23,6 +27,8 @@ def test_import_sync_api():
 @mark.sqlalchemy("1.4")
 def test_import_async_api():
     from fastapi_sqla import (  # noqa
+        AsyncKeysetPaginate,
+        AsyncKeysetPagination,
         AsyncPaginate,
         AsyncPaginateSignature,
         AsyncPagination,
@@ -0,0 +1,122 @@
+import httpx
+from fastapi import FastAPI
+from pytest import fixture
+from sqlalchemy import text
+
+
+def test_histogram_buckets_are_cumulative():
+    from fastapi_sqla.metrics import Histogram
+
+    histogram = Histogram()
+    for duration_ms in (0.5, 3, 3, 20000):
+        histogram.observe(duration_ms)
+
+    stats = histogram.stats()
+    assert stats["buckets"]["1"] == 1
+    assert stats["buckets"]["5"] == 3
+    assert stats["buckets"]["10000"] == 3
+    assert stats["buckets"]["+Inf"] == 4
+    assert stats["count"] == 4
+    assert stats["sum"] == 20006.5
+
+
+@fixture
+def startup():
+    from fastapi_sqla.sqla import startup
+
+    startup()
+
+
+def test_pool_stats(startup):
+    from fastapi_sqla.metrics import get_pool_stats
+    from fastapi_sqla.sqla import open_session
+
+    sessions_opened = get_pool_stats()["sessions_opened"]
+    with open_session() as session:
+        session.execute(text("select 1"))
+
+    stats = get_pool_stats()
+    writer = stats["engines"]["writer"]
+    assert stats["sessions_opened"] == sessions_opened + 1
+    assert writer["checkout_wait_ms"]["count"] >= 1
+    assert writer["checkedout"] == 0
+    assert writer["invalidations"] == 0
+
+
+def test_checkouts_are_timed_after_engine_dispose():
+    from fastapi_sqla.metrics import instrument
+    from fastapi_sqla.sqla import new_engine
+
+    engine = new_engine()
+    metrics = instrument("disposed", engine)
+    engine.dispose()
+    with engine.connect() as connection:
+        connection.execute(text("select 1"))
+
+    assert metrics.checkout_wait.count == 1
+
+
+async def test_metrics_endpoint(startup):
+    from fastapi_sqla.metrics import metrics_endpoint
+
+    app = FastAPI()
+    app.add_route("/metrics", metrics_endpoint)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://example.local"
+    ) as client:
+        res = await client.get("/metrics")
+
+    assert res.status_code == 200
+    assert 'fastapi_sqla_sessions_opened_total{engine_key="default"}' in res.text
+    assert (
+        'fastapi_sqla_pool_checkout_wait_ms_bucket{engine_key="default",'
+        'engine="writer",le="+Inf"}'
+    ) in res.text
+
+
+def test_slow_checkouts_are_logged_once_per_interval():
+    from structlog.testing import capture_logs
+
+    from fastapi_sqla.metrics import SlowCheckoutLogger, instrument
+    from fastapi_sqla.sqla import new_engine
+
+    engine = new_engine()
+    slow_checkouts = SlowCheckoutLogger(threshold_ms=10, interval_s=60)
+    metrics = instrument("slow", engine, slow_checkouts=slow_checkouts)
+
+    with capture_logs() as caplog:
+        slow_checkouts.observe("slow", metrics, 5)
+        slow_checkouts.observe("slow", metrics, 50)
+        slow_checkouts.observe("slow", metrics, 80)
+
+    assert len(caplog) == 1
+    assert caplog[0]["event"] == "slow pool checkout"
+    assert caplog[0]["engine_key"] == "slow"
+    assert caplog[0]["wait_ms"] == 50
+    assert caplog[0]["suppressed"] == 0
+    assert "checkedout" in caplog[0]
+
+
+def test_slow_checkout_is_logged_with_route(monkeypatch, startup):
+    from structlog.testing import capture_logs
+
+    from fastapi_sqla.metrics import current_route
+    from fastapi_sqla.sqla import open_session
+    from fastapi_sqla.sqla import startup as sqla_startup
+
+    monkeypatch.setenv("fastapi_sqla_slow_checkout_threshold_ms", "0")
+    # startup checkouts are slow too: do not let them suppress the next log
+    monkeypatch.setenv("fastapi_sqla_slow_checkout_log_interval", "0")
+    sqla_startup()
+
+    token = current_route.set("GET /users")
+    try:
+        with capture_logs() as caplog, open_session() as session:
+            session.execute(text("select 1"))
+    finally:
+        current_route.reset(token)
+
+    assert [log["route"] for log in caplog if log["event"] == "slow pool checkout"] == [
+        "GET /users"
+    ]
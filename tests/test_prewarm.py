@@ -0,0 +1,37 @@
+from pytest import fixture, mark
+
+
+@fixture
+def prewarm_connections(monkeypatch):
+    monkeypatch.setenv("fastapi_sqla_prewarm_connections", "3")
+
+
+def test_get_prewarm_connections_is_capped_to_pool_size(monkeypatch):
+    from fastapi_sqla.sqla import get_prewarm_connections, new_engine
+
+    monkeypatch.setenv("fastapi_sqla_prewarm_connections", "20")
+    monkeypatch.setenv("sqlalchemy_pool_size", "4")
+
+    assert get_prewarm_connections("default", new_engine()) == 4
+
+
+def test_startup_prewarms_pool(prewarm_connections):
+    from fastapi_sqla.sqla import _DEFAULT_SESSION_KEY, _session_factories, startup
+
+    startup()
+
+    engine = _session_factories[_DEFAULT_SESSION_KEY].kw["bind"].engine
+    assert engine.pool.checkedin() == 3
+
+
+@mark.require_asyncpg
+@mark.sqlalchemy("1.4")
+async def test_async_startup_prewarms_pool(monkeypatch, async_session_key):
+    from fastapi_sqla.async_sqla import _async_session_factories, startup
+
+    monkeypatch.setenv(f"fastapi_sqla__{async_session_key}__prewarm_connections", "3")
+
+    await startup(async_session_key)
+
+    engine = _async_session_factories[async_session_key].kw["bind"]
+    assert engine.sync_engine.pool.checkedin() == 3
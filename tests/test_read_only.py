@@ -0,0 +1,216 @@
+import httpx
+from asgi_lifespan import LifespanManager
+from fastapi import FastAPI
+from pytest import fixture, mark, param, raises
+from sqlalchemy import select, text
+from sqlalchemy.exc import DBAPIError
+
+
+@fixture
+def read_only_safe_methods(monkeypatch):
+    monkeypatch.setenv("fastapi_sqla_read_only_safe_methods", "true")
+
+
+@fixture
+def startup():
+    from fastapi_sqla.sqla import startup
+
+    startup()
+
+
+def is_transaction_read_only(session) -> bool:
+    return session.execute(text("show transaction_read_only")).scalar() == "on"
+
+
+def test_read_only_session_transaction_is_read_only(startup):
+    from fastapi_sqla.sqla import open_session
+
+    with open_session(read_only=True) as session:
+        assert is_transaction_read_only(session)
+
+
+def test_read_only_session_fails_writing(startup):
+    from fastapi_sqla.sqla import open_session
+
+    with (
+        raises(DBAPIError, match="read-only transaction"),
+        open_session(read_only=True) as session,
+    ):
+        session.execute(text("create temporary table tmp (id integer)"))
+
+
+def test_read_only_session_is_clean_after_reads(startup):
+    from fastapi_sqla.sqla import is_clean, open_session
+
+    with open_session(read_only=True) as session:
+        session.execute(text("select 1"))
+
+        assert is_clean(session)
+
+
+def test_read_only_session_routes_any_statement_to_reader(monkeypatch, db_url):
+    from fastapi_sqla.sqla import (
+        _DEFAULT_SESSION_KEY,
+        _session_factories,
+        make_read_only,
+        startup,
+    )
+
+    monkeypatch.setenv("fastapi_sqla_reader_urls", db_url)
+    startup()
+
+    session = _session_factories[_DEFAULT_SESSION_KEY]()
+    make_read_only(session, _DEFAULT_SESSION_KEY)
+
+    assert session.get_bind(clause=text("select 1")) in session.readers
+    session.close()
+
+
+def is_in_transaction_block(session) -> bool:
+    """Return whether consecutive statements of session share a transaction."""
+    first = session.execute(text("select clock_timestamp(), now()")).one()
+    return session.execute(text("select now()")).scalar() <= first[0]
+
+
+def test_autocommit_session_runs_statements_without_transaction(startup):
+    from fastapi_sqla.sqla import is_clean, open_session
+
+    with open_session(autocommit=True) as session:
+        assert not is_in_transaction_block(session)
+        assert is_clean(session)
+
+    with open_session() as session:
+        assert is_in_transaction_block(session)
+
+
+def test_read_only_autocommit_session_skips_set_transaction(startup):
+    from sqlalchemy import event
+
+    from fastapi_sqla.sqla import get_engine, open_session
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = get_engine().engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        with open_session(read_only=True, autocommit=True) as session:
+            session.execute(text("select 1"))
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert statements == ["select 1"]
+
+
+def test_autocommit_session_routes_reads_to_autocommit_reader(monkeypatch, db_url):
+    from fastapi_sqla.read_replicas import get_autocommit_engine
+    from fastapi_sqla.sqla import (
+        _DEFAULT_SESSION_KEY,
+        _session_factories,
+        make_autocommit,
+        startup,
+    )
+
+    monkeypatch.setenv("fastapi_sqla_reader_urls", db_url)
+    startup()
+
+    session = _session_factories[_DEFAULT_SESSION_KEY]()
+    make_autocommit(session, _DEFAULT_SESSION_KEY)
+
+    bind = session.get_bind(clause=select(text("1")))
+    assert bind in [get_autocommit_engine(reader) for reader in session.readers]
+    session.close()
+
+
+@fixture
+async def client(read_only_safe_methods):
+    from contextlib import asynccontextmanager
+
+    from fastapi import Depends
+
+    from fastapi_sqla import (
+        ReadOnlySession,
+        Session,
+        SessionDependency,
+        SqlaSession,
+        setup_middlewares,
+    )
+    from fastapi_sqla import startup as fastapi_sqla_startup
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await fastapi_sqla_startup()
+        yield
+
+    app = FastAPI(lifespan=lifespan)
+    setup_middlewares(app)
+
+    @app.get("/read")
+    def read(session: Session):
+        return {"read_only": is_transaction_read_only(session)}
+
+    @app.post("/read")
+    def post_read(session: Session):
+        return {"read_only": is_transaction_read_only(session)}
+
+    @app.post("/tagged")
+    def tagged(session: ReadOnlySession):
+        return {"read_only": is_transaction_read_only(session)}
+
+    @app.get("/autocommit")
+    def autocommit(
+        session: SqlaSession = Depends(SessionDependency(autocommit=True)),
+    ):
+        return {"in_transaction": is_in_transaction_block(session)}
+
+    async with (
+        LifespanManager(app),
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://example.local"
+        ) as client,
+    ):
+        yield client
+
+
+@mark.parametrize(
+    "method, path, expected",
+    [
+        param("GET", "/read", True, id="safe method"),
+        param("POST", "/read", False, id="unsafe method"),
+        param("POST", "/tagged", True, id="read only dependency"),
+    ],
+)
+async def test_read_only_requests(client, method, path, expected):
+    from fastapi_sqla.sqla import get_middleware_stats
+
+    res = await client.request(method, path)
+
+    assert res.status_code == 200
+    assert res.json() == {"read_only": expected}
+    assert get_middleware_stats()["commits"] == (0 if expected else 1)
+
+
+async def test_autocommit_dependency(client):
+    from fastapi_sqla.sqla import get_middleware_stats
+
+    res = await client.get("/autocommit")
+
+    assert res.status_code == 200
+    assert res.json() == {"in_transaction": False}
+    assert get_middleware_stats()["commits"] == 0
+
+
+@mark.require_asyncpg
+@mark.sqlalchemy("1.4")
+async def test_async_read_only_session_transaction_is_read_only(async_session_key):
+    from fastapi_sqla.async_sqla import open_session, startup
+
+    await startup(async_session_key)
+
+    async with open_session(async_session_key, read_only=True) as session:
+        res = await session.execute(text("show transaction_read_only"))
+        await session.execute(select(text("1")))
+
+        assert res.scalar() == "on"
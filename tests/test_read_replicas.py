@@ -0,0 +1,187 @@
+from unittest.mock import Mock
+
+import httpx
+from asgi_lifespan import LifespanManager
+from fastapi import FastAPI
+from pytest import fixture, mark, param, raises
+from sqlalchemy import insert, select, table, text
+
+
+@fixture
+def reader_urls(monkeypatch, db_url):
+    reader_urls = f"{db_url},{db_url}"
+    monkeypatch.setenv("fastapi_sqla_reader_urls", reader_urls)
+    return reader_urls
+
+
+@fixture
+def session(reader_urls):
+    from fastapi_sqla.sqla import _DEFAULT_SESSION_KEY, _session_factories, startup
+
+    startup()
+
+    session = _session_factories[_DEFAULT_SESSION_KEY]()
+    yield session
+    session.close()
+
+
+def test_select_is_routed_to_a_reader(session):
+    bind = session.get_bind(clause=select(text("1")))
+
+    assert bind in session.readers
+    assert session.execute(select(text("123"))).scalar() == 123
+
+
+def test_select_for_update_is_routed_to_writer(session):
+    bind = session.get_bind(clause=select(text("1")).with_for_update())
+
+    assert bind is session.bind.engine
+
+
+def test_session_sticks_to_writer_after_a_write(session):
+    writer = session.get_bind(clause=insert(table("user")))
+
+    assert writer is session.bind.engine
+    assert session.get_bind(clause=select(text("1"))) is writer
+
+
+def test_current_lsn_does_not_begin_a_session_transaction(session):
+    from fastapi_sqla.read_replicas import get_current_lsn, is_lsn, uses_writer
+
+    # Any statement but a select is routed to the writer
+    session.execute(text("select 1"))
+    session.commit()
+
+    assert uses_writer(session)
+    assert is_lsn(get_current_lsn(session))
+    assert not session.in_transaction()
+
+
+def test_reader_is_selected_round_robin(session):
+    from fastapi_sqla.sqla import _DEFAULT_SESSION_KEY, _session_factories
+
+    other_session = _session_factories[_DEFAULT_SESSION_KEY]()
+    query = select(text("1"))
+
+    assert session.get_bind(clause=query) is session.get_bind(clause=query)
+    assert session.get_bind(clause=query) is not other_session.get_bind(clause=query)
+
+
+def test_least_checked_out_selects_least_busy_reader():
+    from fastapi_sqla.read_replicas import least_checked_out
+
+    busy, idle = Mock(), Mock()
+    busy.pool.checkedout.return_value = 3
+    idle.pool.checkedout.return_value = 1
+
+    assert least_checked_out([busy, idle])() is idle
+
+
+def test_startup_fails_on_unknown_reader_routing(monkeypatch, reader_urls):
+    from fastapi_sqla.sqla import startup
+
+    monkeypatch.setenv("fastapi_sqla_reader_routing", "random")
+
+    with raises(ValueError, match="Unknown reader routing 'random'"):
+        startup()
+
+
+@mark.require_asyncpg
+@mark.sqlalchemy("1.4")
+async def test_async_select_is_routed_to_a_reader(
+    monkeypatch, async_session_key, async_sqlalchemy_url
+):
+    from fastapi_sqla.async_sqla import _async_session_factories, startup
+
+    monkeypatch.setenv(
+        f"fastapi_sqla__{async_session_key}__reader_urls", async_sqlalchemy_url
+    )
+
+    await startup(async_session_key)
+
+    async with _async_session_factories[async_session_key]() as session:
+        bind = session.sync_session.get_bind(clause=select(text("1")))
+        res = await session.execute(select(text("123")))
+
+    assert bind in session.sync_session.readers
+    assert res.scalar() == 123
+
+
+def test_reader_behind_required_lsn_is_not_used(session):
+    from fastapi_sqla.read_replicas import required_lsns
+    from fastapi_sqla.sqla import _DEFAULT_SESSION_KEY
+
+    context_token = required_lsns.set({_DEFAULT_SESSION_KEY: "FFFFFFFF/FFFFFFFF"})
+    try:
+        bind = session.get_bind(clause=select(text("1")))
+    finally:
+        required_lsns.reset(context_token)
+
+    assert bind is session.bind.engine
+
+
+@fixture
+async def client(reader_urls, monkeypatch):
+    from contextlib import asynccontextmanager
+
+    from fastapi_sqla import Session, setup_middlewares, startup
+
+    monkeypatch.setenv("fastapi_sqla_consistency_header", "x-db-lsn")
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await startup()
+        yield
+
+    app = FastAPI(lifespan=lifespan)
+    setup_middlewares(app)
+
+    @app.post("/write")
+    def write(session: Session):
+        # Any statement but a select is routed to the writer
+        session.execute(text("select 1"))
+
+    @app.get("/read")
+    def read(session: Session):
+        bind = session.get_bind(clause=select(text("1")))
+        return {"reader": bind in session.readers}
+
+    async with (
+        LifespanManager(app),
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://example.local"
+        ) as client,
+    ):
+        yield client
+
+
+async def test_write_returns_consistency_token(client):
+    from fastapi_sqla.read_replicas import is_lsn
+
+    res = await client.post("/write")
+
+    assert res.status_code == 200
+    assert is_lsn(res.headers["x-db-lsn"])
+
+
+async def test_read_does_not_return_consistency_token(client):
+    res = await client.get("/read")
+
+    assert res.status_code == 200
+    assert "x-db-lsn" not in res.headers
+
+
+@mark.parametrize(
+    "headers, expected",
+    [
+        param({}, True, id="no token"),
+        param({"x-db-lsn": "0/0"}, True, id="token replayed"),
+        param({"x-db-lsn": "FFFFFFFF/FFFFFFFF"}, False, id="token not replayed"),
+        param({"x-db-lsn": "not a lsn"}, True, id="invalid token"),
+    ],
+)
+async def test_read_routing_with_consistency_token(client, headers, expected):
+    res = await client.get("/read", headers=headers)
+
+    assert res.status_code == 200
+    assert res.json() == {"reader": expected}
@@ -0,0 +1,204 @@
+from unittest.mock import patch
+
+from pytest import fixture, mark
+from sqlalchemy import inspect, select, text
+
+pytestmark = mark.sqlalchemy("2.0")
+
+
+@fixture(autouse=True)
+def setup_tear_down(engine):
+    with engine.connect() as connection:
+        with connection.begin():
+            connection.execute(
+                text(
+                    "CREATE TABLE IF NOT EXISTS reflected_table "
+                    "(id integer primary key, name varchar)"
+                )
+            )
+        yield
+        with connection.begin():
+            connection.execute(text("DROP TABLE reflected_table"))
+
+
+def new_reflected_class():
+    from sqlalchemy.ext.declarative import DeferredReflection
+    from sqlalchemy.orm import DeclarativeBase
+
+    class Base(DeclarativeBase, DeferredReflection):
+        __abstract__ = True
+
+    class ReflectedTable(Base):
+        __tablename__ = "reflected_table"
+
+    return Base, ReflectedTable
+
+
+def test_snapshot_is_loaded_instead_of_reflecting(engine, tmp_path):
+    from fastapi_sqla import reflection
+
+    base, cls = new_reflected_class()
+    reflection.prepare(base, engine, cache_dir=str(tmp_path))
+
+    assert len(list(tmp_path.glob("fastapi_sqla_*.pickle"))) == 1
+    assert sorted(inspect(cls).columns.keys()) == ["id", "name"]
+
+    base, cls = new_reflected_class()
+    with patch.object(reflection, "reflect") as reflect:
+        reflection.prepare(base, engine, cache_dir=str(tmp_path))
+
+    reflect.assert_not_called()
+    assert sorted(inspect(cls).columns.keys()) == ["id", "name"]
+    assert inspect(cls).primary_key[0].name == "id"
+
+
+def test_prepare_defaults_to_base_prepare(engine):
+    from fastapi_sqla import reflection
+
+    base, cls = new_reflected_class()
+    with patch.object(reflection, "get_deferred_tables") as get_deferred_tables:
+        reflection.prepare(base, engine)
+
+    get_deferred_tables.assert_not_called()
+    assert sorted(inspect(cls).columns.keys()) == ["id", "name"]
+
+
+def test_deferred_tables_are_the_unmapped_ones(engine):
+    from fastapi_sqla.reflection import get_deferred_tables
+
+    base, _ = new_reflected_class()
+    assert [table.name for table in get_deferred_tables(base)] == ["reflected_table"]
+
+    base.prepare(engine)
+
+    assert get_deferred_tables(base) == []
+
+
+def test_fingerprint_changes_with_schema(engine):
+    from fastapi_sqla.reflection import get_deferred_tables, get_fingerprint
+
+    base, _ = new_reflected_class()
+    tables = get_deferred_tables(base)
+
+    with engine.connect() as connection:
+        fingerprint = get_fingerprint(connection, tables)
+
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE reflected_table ADD COLUMN extra integer"))
+
+    with engine.connect() as connection:
+        assert get_fingerprint(connection, tables) != fingerprint
+
+
+@fixture
+def lazy_reflection(monkeypatch):
+    monkeypatch.setenv("fastapi_sqla_lazy_reflection", "true")
+
+
+def test_lazy_reflection_reflects_class_on_first_query(lazy_reflection):
+    from fastapi_sqla.reflection import is_mapped
+    from fastapi_sqla.sqla import Base, open_session, startup
+
+    class ReflectedTable(Base):
+        __tablename__ = "reflected_table"
+
+    startup()
+    assert not is_mapped(ReflectedTable)
+
+    with open_session() as session:
+        assert session.execute(select(ReflectedTable)).all() == []
+
+    assert sorted(inspect(ReflectedTable).columns.keys()) == ["id", "name"]
+
+
+def test_lazy_reflection_reflects_class_on_instantiation(lazy_reflection):
+    from fastapi_sqla.sqla import Base, open_session, startup
+
+    class ReflectedTable(Base):
+        __tablename__ = "reflected_table"
+
+    startup()
+
+    with open_session() as session:
+        session.add(ReflectedTable(id=1, name="reflected"))
+        session.flush()
+        assert session.get(ReflectedTable, 1).name == "reflected"
+        session.rollback()
+
+
+def test_lazy_reflection_ignores_classes_of_other_bases(engine):
+    from fastapi_sqla.reflection import (
+        enable_lazy_reflection,
+        is_mapped,
+        reflect_lazily,
+    )
+
+    lazy_base, _ = new_reflected_class()
+    _, cls = new_reflected_class()
+    enable_lazy_reflection(lazy_base, engine)
+
+    assert not reflect_lazily(cls)
+    assert not is_mapped(cls)
+
+
+def test_split_tables_in_batches():
+    from sqlalchemy import MetaData, Table
+
+    from fastapi_sqla.reflection import split
+
+    metadata = MetaData()
+    tables = [Table(name, metadata) for name in ("a", "b", "c", "d", "e")]
+
+    assert [[table.name for table in batch] for batch in split(tables, 2)] == [
+        ["a", "c", "e"],
+        ["b", "d"],
+    ]
+    assert len(split(tables[:1], 4)) == 1
+
+
+def test_startup_reflects_concurrently(monkeypatch, engine):
+    from fastapi_sqla.sqla import Base, open_session, startup
+
+    monkeypatch.setenv("fastapi_sqla_reflection_concurrency", "2")
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE TABLE IF NOT EXISTS other_table (id integer primary key)")
+        )
+
+    class ReflectedTable(Base):
+        __tablename__ = "reflected_table"
+
+    class OtherTable(Base):
+        __tablename__ = "other_table"
+
+    try:
+        startup()
+
+        with open_session() as session:
+            assert session.execute(select(ReflectedTable)).all() == []
+            assert session.execute(select(OtherTable)).all() == []
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE other_table"))
+
+    assert sorted(inspect(ReflectedTable).columns.keys()) == ["id", "name"]
+
+
+async def test_prepare_lock_is_released_when_async_startup_is_cancelled():
+    import asyncio
+
+    from fastapi_sqla.async_sqla import holding_prepare_lock
+    from fastapi_sqla.reflection import lock
+
+    async def hold_lock():
+        async with holding_prepare_lock():
+            pass
+
+    with lock:
+        task = asyncio.create_task(hold_lock())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert await asyncio.to_thread(lock.acquire, timeout=1)
+    lock.release()
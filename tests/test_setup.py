@@ -18,7 +18,7 @@ def sqla_startup_mock():
 
 
 def test_setup_multiple_engines(db_url):
-    from fastapi_sqla.base import setup
+    from fastapi_sqla.base import SqlaMiddleware, setup
     from fastapi_sqla.sqla import _DEFAULT_SESSION_KEY
 
     read_only_key = "read_only"
@@ -50,19 +50,17 @@ def test_setup_multiple_engines(db_url):
         and call.args[1].keywords == {"key": read_only_key}
     )
 
-    assert app.add_middleware.call_count == 2
-    assert all(
-        call.args[0] == sqla.SessionMiddleware for call in app.middleware.call_args_list
+    app.add_middleware.assert_called_once_with(
+        SqlaMiddleware,
+        sync_keys=sorted([_DEFAULT_SESSION_KEY, read_only_key]),
+        async_keys=[],
     )
 
-    app.add_middleware.assert_any_call(sqla.SessionMiddleware, key=_DEFAULT_SESSION_KEY)
-    app.add_middleware.assert_any_call(sqla.SessionMiddleware, key=read_only_key)
-
 
 @mark.sqlalchemy("1.4")
 @mark.require_asyncpg
 def test_setup_with_sync_and_async_sqlalchemy_url(async_session_key):
-    from fastapi_sqla.base import setup
+    from fastapi_sqla.base import SqlaMiddleware, setup
     from fastapi_sqla.sqla import _DEFAULT_SESSION_KEY
 
     app = Mock()
@@ -84,17 +82,15 @@ def test_setup_with_sync_and_async_sqlalchemy_url(async_session_key):
         and call.args[1].keywords == {"key": async_session_key}
     )
 
-    assert app.add_middleware.call_count == 2
-    app.add_middleware.assert_any_call(sqla.SessionMiddleware, key=_DEFAULT_SESSION_KEY)
-    app.add_middleware.assert_any_call(
-        async_sqla.AsyncSessionMiddleware, key=async_session_key
+    app.add_middleware.assert_called_once_with(
+        SqlaMiddleware, sync_keys=[_DEFAULT_SESSION_KEY], async_keys=[async_session_key]
     )
 
 
 @mark.sqlalchemy("1.4")
 @mark.require_asyncpg
 def test_setup_with_async_default_sqlalchemy_url(async_sqlalchemy_url):
-    from fastapi_sqla.base import setup
+    from fastapi_sqla.base import SqlaMiddleware, setup
     from fastapi_sqla.sqla import _DEFAULT_SESSION_KEY
 
     app = Mock()
@@ -111,7 +107,7 @@ def test_setup_with_async_default_sqlalchemy_url(async_sqlalchemy_url):
     }
 
     app.add_middleware.assert_called_once_with(
-        async_sqla.AsyncSessionMiddleware, key=_DEFAULT_SESSION_KEY
+        SqlaMiddleware, sync_keys=[], async_keys=[_DEFAULT_SESSION_KEY]
     )
 
 
@@ -51,6 +51,18 @@ def test_startup_case_insensitive(environ):
     assert session.execute(text("SELECT 123")).scalar() == 123
 
 
+def test_startup_reads_options_again(monkeypatch):
+    from fastapi_sqla.sqla import get_option, startup
+
+    assert get_option("default", "max_sessions") is None
+    monkeypatch.setenv("FASTAPI_SQLA_MAX_SESSIONS", "3")
+    assert get_option("default", "max_sessions") is None
+
+    startup()
+
+    assert get_option("default", "max_sessions") == "3"
+
+
 def test_startup_with_key(monkeypatch, db_url):
     from fastapi_sqla.sqla import _session_factories, startup
 
@@ -239,3 +251,55 @@ async def test_new_async_engine_hide_parameters_opt_out(monkeypatch, async_sessi
     engine_or_conn = new_async_engine(async_session_key)
 
     assert engine_or_conn.sync_engine.hide_parameters is False
+
+
+def test_startup_creates_executor_sized_to_pool(monkeypatch):
+    from fastapi_sqla.sqla import get_executor_stats, startup
+
+    monkeypatch.setenv("sqlalchemy_pool_size", "3")
+    monkeypatch.setenv("sqlalchemy_max_overflow", "2")
+
+    startup()
+
+    assert get_executor_stats() == {"max_workers": 5, "in_flight": 0, "queue_depth": 0}
+
+
+async def test_run_in_executor_uses_key_executor():
+    import threading
+
+    from fastapi_sqla.sqla import _DEFAULT_SESSION_KEY, run_in_executor, startup
+
+    startup()
+
+    thread_name = await run_in_executor(
+        _DEFAULT_SESSION_KEY, lambda: threading.current_thread().name
+    )
+
+    assert thread_name.startswith("fastapi_sqla_default")
+
+
+def test_startup_registers_engine():
+    from fastapi_sqla.sqla import _session_factories, get_engine, startup
+
+    startup()
+
+    assert get_engine() is _session_factories["default"].kw["bind"]
+
+
+def test_get_engine_fails_before_startup():
+    from fastapi_sqla.sqla import get_engine
+
+    with raises(KeyError, match="No engine with key 'default' found"):
+        get_engine()
+
+
+def test_engine_config_is_parsed_again_at_startup(monkeypatch):
+    from fastapi_sqla.sqla import get_engine, get_engine_config, startup
+
+    get_engine_config()
+    monkeypatch.setenv("sqlalchemy_pool_size", "3")
+    assert "sqlalchemy_pool_size" not in get_engine_config()
+
+    startup()
+
+    assert get_engine().pool.size() == 3
@@ -0,0 +1,121 @@
+import httpx
+from asgi_lifespan import LifespanManager
+from fastapi import FastAPI
+from pytest import fixture, mark, param, raises
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+
+@mark.parametrize(
+    "value, expected",
+    [
+        param(None, None, id="missing"),
+        param("", None, id="empty"),
+        param("250", 250.0, id="milliseconds"),
+        param("12.5", 12.5, id="float"),
+        param("-1", None, id="negative"),
+        param("0", None, id="zero"),
+        param("inf", None, id="infinite"),
+        param("nan", None, id="nan"),
+        param("1e300", 2**31 - 1, id="too large"),
+        param("soon", None, id="invalid"),
+    ],
+)
+def test_parse_timeout(value, expected):
+    from fastapi_sqla.statement_timeout import parse_timeout
+
+    assert parse_timeout(value) == expected
+
+
+def test_statement_past_deadline_is_canceled():
+    import time
+
+    from fastapi_sqla.sqla import _DEFAULT_SESSION_KEY, open_session, startup
+    from fastapi_sqla.statement_timeout import deadlines
+
+    startup()
+
+    context_token = deadlines.set({_DEFAULT_SESSION_KEY: time.monotonic() + 0.1})
+    try:
+        with (
+            raises(DBAPIError, match="statement timeout"),
+            open_session() as session,
+        ):
+            session.execute(text("select pg_sleep(1)"))
+    finally:
+        deadlines.reset(context_token)
+
+
+def test_autocommit_statement_past_deadline_is_canceled():
+    import time
+
+    from fastapi_sqla.sqla import (
+        _DEFAULT_SESSION_KEY,
+        get_engine,
+        open_session,
+        startup,
+    )
+    from fastapi_sqla.statement_timeout import deadlines
+
+    startup()
+
+    context_token = deadlines.set({_DEFAULT_SESSION_KEY: time.monotonic() + 0.1})
+    try:
+        with (
+            raises(DBAPIError, match="statement timeout"),
+            open_session(autocommit=True) as session,
+        ):
+            session.execute(text("select pg_sleep(1)"))
+    finally:
+        deadlines.reset(context_token)
+
+    # The timeout is reset when the connection returns to the pool
+    with get_engine().connect() as connection:
+        assert connection.execute(text("show statement_timeout")).scalar() == "0"
+
+
+@fixture
+async def client(monkeypatch):
+    from contextlib import asynccontextmanager
+
+    from fastapi_sqla import Session, setup_middlewares, startup
+
+    monkeypatch.setenv("fastapi_sqla_deadline_header", "x-request-deadline")
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await startup()
+        yield
+
+    app = FastAPI(lifespan=lifespan)
+    setup_middlewares(app)
+
+    @app.get("/statement_timeout")
+    def get_statement_timeout(session: Session):
+        return session.execute(
+            text("select current_setting('statement_timeout')")
+        ).scalar()
+
+    async with (
+        LifespanManager(app),
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://example.local"
+        ) as client,
+    ):
+        yield client
+
+
+async def test_deadline_header_sets_statement_timeout(client):
+    res = await client.get(
+        "/statement_timeout", headers={"x-request-deadline": "60000"}
+    )
+
+    assert res.status_code == 200
+    assert res.json() not in ("0", "1ms")
+
+
+async def test_no_deadline_header_keeps_statement_timeout(client):
+    res = await client.get("/statement_timeout")
+
+    assert res.status_code == 200
+    assert res.json() == "0"